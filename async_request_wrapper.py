@@ -0,0 +1,198 @@
+import asyncio
+import logging
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+
+import aiohttp
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from circuit_breaker import CircuitBreaker
+from rate_limiter import TokenBucket
+from request_wrapper import get_host_guards
+from retry_policy import RetryPolicy
+
+
+class AsyncResponse:
+    """Прочитанный ответ aiohttp с интерфейсом, совместимым с requests.Response"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], text: str):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def raise_for_status(self):
+        """Выбрасывает requests.HTTPError для ответов 4xx/5xx"""
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class AsyncRequestWrapper:
+    """
+    Асинхронный аналог RequestWrapper с тем же контрактом get/post/повторов.
+
+    Соединения берутся из общего пула aiohttp, число одновременных запросов
+    к одному хосту ограничено, а пауза между попытками не блокирует цикл событий.
+    Попытки проходят через те же общие get_host_guards, что и у RequestWrapper:
+    ограничение частоты и автомат защиты сервера действуют на оба клиента.
+
+    Истёкшую сессию обёртка сама не обнаруживает и вход не выполняет: это
+    делает RequestWrapper авторизованной сессии. Обёртка из
+    from_globbing_session перед каждой попыткой берёт cookies новой сессии,
+    если повторный вход её заменил.
+    """
+
+    def __init__(self, cookies: Optional[Dict[str, str]] = None, headers: Optional[Dict[str, str]] = None,
+                 max_retries: int = 3, retry_delay: float = 1, limit: int = 100, limit_per_host: int = 8,
+                 timeout: float = 30, retry_policy: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[TokenBucket] = None, circuit_breaker: Optional[CircuitBreaker] = None):
+        self._cookies = cookies or {}
+        self._headers = headers or {}
+        self._retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries, base_delay=retry_delay)
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        # Без явных ограничителя и автомата берутся общие для сервера get_host_guards
+        self._rate_limiter = rate_limiter
+        self._circuit_breaker = circuit_breaker
+        self._session: Optional[aiohttp.ClientSession] = None
+        # RequestWrapper, из сессии которого берутся cookies, и сессия последней синхронизации
+        self._source = None
+        self._source_session: Optional[requests.Session] = None
+        self._logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_session(cls, session: requests.Session, **kwargs) -> "AsyncRequestWrapper":
+        """Создаёт обёртку с cookies и заголовками авторизованной requests.Session"""
+        return cls(cookies=session.cookies.get_dict(), headers=dict(session.headers), **kwargs)
+
+    @classmethod
+    def from_globbing_session(cls, globbing_session, **kwargs) -> "AsyncRequestWrapper":
+        """
+        Создаёт обёртку для GlobbingSession, которая следует за повторными входами
+
+        GlobbingSession.refresh заменяет requests.Session, и без синхронизации
+        асинхронный клиент продолжал бы отправлять cookies истёкшей сессии.
+        """
+        source = globbing_session.request_wrapper
+        session = source.get_session()
+        wrapper = cls.from_session(session, **kwargs)
+        wrapper._source = source
+        wrapper._source_session = session
+        return wrapper
+
+    def _sync_cookies(self):
+        """Берёт cookies текущей сессии источника, если после повторного входа она новая"""
+        if self._source is None:
+            return
+        session = self._source.get_session()
+        if session is self._source_session:
+            return
+        self._source_session = session
+        self._cookies = session.cookies.get_dict()
+        if self._session is not None and not self._session.closed:
+            self._session.cookie_jar.clear()
+            self._session.cookie_jar.update_cookies(self._cookies)
+
+    async def __aenter__(self) -> "AsyncRequestWrapper":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Возвращает общую сессию aiohttp, создавая её при первом запросе"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._limit, limit_per_host=self._limit_per_host)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                cookies=self._cookies,
+                headers=self._headers,
+                timeout=self._timeout
+            )
+        return self._session
+
+    async def _send(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        """Выполняет один запрос и читает тело ответа"""
+        # Лимит соединений на хост обеспечивает TCPConnector: лишние запросы ждут в очереди
+        async with self._get_session().request(method, url, **kwargs) as response:
+            text = await response.text()
+            return AsyncResponse(str(response.url), response.status, CaseInsensitiveDict(response.headers), text)
+
+    def _guards(self, url: str):
+        """Ограничитель частоты и автомат защиты для сервера из url"""
+        if self._rate_limiter and self._circuit_breaker:
+            return self._rate_limiter, self._circuit_breaker
+        shared_limiter, shared_breaker = get_host_guards(urlparse(url).netloc)
+        return self._rate_limiter or shared_limiter, self._circuit_breaker or shared_breaker
+
+    @staticmethod
+    async def _acquire(rate_limiter: TokenBucket):
+        """Ждёт токен, не блокируя цикл событий"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        while True:
+            wait = rate_limiter.try_acquire()
+            if wait == 0:
+                rate_limiter.waited_seconds += loop.time() - started
+                return
+            await asyncio.sleep(wait)
+
+    async def _make_request(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        """Выполняет HTTP запрос с повторными попытками по правилам retry_policy"""
+        policy = self._retry_policy
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        attempt = 0
+        while True:
+            attempt += 1
+            # Разомкнутая цепь прерывает и повторы: CircuitOpenError выбрасывается до запроса
+            rate_limiter, circuit_breaker = self._guards(url)
+            circuit_breaker.before_call()
+            await self._acquire(rate_limiter)
+            response = None
+            self._sync_cookies()
+            try:
+                response = await self._send(method, url, **kwargs)
+                response.raise_for_status()
+                circuit_breaker.record_success()
+                return response
+            except (aiohttp.ClientError, asyncio.TimeoutError, requests.HTTPError) as e:
+                status_code = response.status_code if response is not None else None
+                if status_code is None or status_code in policy.status_codes:
+                    circuit_breaker.record_failure()
+                else:
+                    circuit_breaker.record_success()  # Сервер отвечает, ошибка в самом запросе
+                delay = policy.next_delay(
+                    method, attempt, loop.time() - started, status_code,
+                    response.headers if response is not None else None
+                )
+                self._logger.error(f"Attempt {attempt}/{policy.max_attempts} failed: {str(e)}")
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> AsyncResponse:
+        """Выполняет GET запрос"""
+        return await self._make_request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> AsyncResponse:
+        """Выполняет POST запрос"""
+        return await self._make_request('POST', url, **kwargs)
+
+    def update_cookies(self, cookies: Dict[str, Any]):
+        """Обновляет cookies, например после повторной авторизации"""
+        self._cookies.update(cookies)
+        if self._session is not None and not self._session.closed:
+            self._session.cookie_jar.update_cookies(cookies)
+
+    async def close(self):
+        """Закрывает сессию и пул соединений"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
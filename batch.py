@@ -0,0 +1,241 @@
+"""
+Пакетная обработка трек-номеров без окна Tk.
+
+Номера читаются из файлов или stdin (по одному в строке, пустые строки
+пропускаются), ищутся теми же сервисами, что и в TrackingApp, и строки
+результата пишутся в CSV или JSON Lines по мере готовности. В конце в stderr
+печатается сводка: сколько номеров обработано и с какой скоростью.
+
+Запуск из корня проекта:
+    python batch.py labels.txt -o results.csv --workers 8
+    cat labels.txt | python batch.py --format jsonl > results.jsonl
+"""
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from contextlib import redirect_stdout
+
+from config import USERNAME, PASSWORD, EXCHANGE_RATE
+from cost_calculator import CostCalculator
+from finder_cache import FinderCache
+from logger import setup_logging
+from messages import PAYMENT_MESSAGE
+from order_store import OrderStore
+from price_service import PriceService
+from response_cache import ResponseCache
+from session import GlobbingSession
+from tracking_info import finder
+from tracking_service import TrackingService, BATCH_MAX_WORKERS
+
+FINDER_CACHE_SIZE = 512
+FIELDS = (
+    'input', 'status', 'tracking_number', 'raw_tracking_number', 'weight', 'cost',
+    'price_usd', 'price_rub', 'message', 'product_page_link', 'error'
+)
+FORMATS = ('csv', 'jsonl')
+
+
+def read_numbers(paths):
+    """
+    Трек-номера из файлов по порядку; '-' или пустой список - stdin
+
+    Yields:
+        str: Номер без пробелов по краям
+    """
+    for path in paths or ['-']:
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8-sig')
+        try:
+            for line in stream:
+                tracking_number = line.strip()
+                if tracking_number:
+                    yield tracking_number
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def make_writer(stream, output_format):
+    """
+    Returns:
+        function: Записывает строку результата и сразу сбрасывает буфер
+    """
+    if output_format == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        write_row = writer.writerow
+    else:
+        def write_row(row):
+            stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def write(row):
+        write_row(row)
+        stream.flush()
+
+    return write
+
+
+class BatchRunner:
+    def __init__(self, tracking_service, cost_calculator, price_service, finder_func):
+        """
+        Args:
+            tracking_service: TrackingService авторизованной сессии
+            cost_calculator: CostCalculator с нужным модификатором стоимости
+            price_service: PriceService с курсом USD
+            finder_func: finder или FinderCache для выбора трек-номера
+        """
+        self.tracking_service = tracking_service
+        self.cost_calculator = cost_calculator
+        self.price_service = price_service
+        self.finder = finder_func
+        self.counts = Counter()
+
+    def make_row(self, tracking_number, tracking_info, error=None):
+        """
+        Строка результата, как строка в окне TrackingApp
+
+        Returns:
+            dict: Поля FIELDS; status - found, finder_only, not_found или error
+        """
+        row = dict.fromkeys(FIELDS)
+        row['input'] = tracking_number
+        if error is not None:
+            row.update(status='error', error=str(error))
+            return row
+
+        tracking_info, tracking_number_text = self.tracking_service.resolve_tracking_number(
+            tracking_number, tracking_info, self.finder
+        )
+        row['tracking_number'] = tracking_number_text
+        if not tracking_info:
+            row['status'] = 'finder_only' if tracking_number_text else 'not_found'
+            return row
+
+        weight = tracking_info['weight']
+        price_usd = tracking_info.get('price_usd')
+        row.update(
+            raw_tracking_number=tracking_info['raw_tracking_number'],
+            weight=weight,
+            price_usd=price_usd,
+            product_page_link=tracking_info['product_page_link']
+        )
+        try:
+            cost = self.cost_calculator.calculate_cost(weight)
+        except ValueError as e:
+            row.update(status='error', error=str(e))
+            return row
+
+        _, price_rub = self.price_service.convert_to_rub(price_usd)
+        row.update(
+            status='found',
+            cost=round(cost, 2),
+            price_rub=round(price_rub, 2),
+            message=PAYMENT_MESSAGE.format(cost=cost)
+        )
+        return row
+
+    def run(self, tracking_numbers, write, max_workers=BATCH_MAX_WORKERS):
+        """
+        Ищет номера в max_workers потоках и передаёт строки в write по мере готовности
+
+        Returns:
+            int: Число обработанных номеров
+        """
+        processed = 0
+        for tracking_number, tracking_info, error in self.tracking_service.search_many(
+            tracking_numbers, max_workers=max_workers
+        ):
+            row = self.make_row(tracking_number, tracking_info, error)
+            self.counts[row['status']] += 1
+            write(row)
+            processed += 1
+        return processed
+
+
+def format_summary(counts, elapsed):
+    total = sum(counts.values())
+    rate = total / elapsed * 60 if elapsed > 0 else 0.0
+    details = ', '.join(f"{status}: {counts[status]}" for status in ('found', 'finder_only', 'not_found', 'error'))
+    return f"Обработано {total} номеров за {elapsed:.1f} с ({rate:.0f} в минуту); {details}"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Поиск трек-номеров из файлов или stdin без окна")
+    parser.add_argument('inputs', nargs='*', help="Файлы с номерами по одному в строке; '-' или ничего - stdin")
+    parser.add_argument('-o', '--output', help="Файл результатов (по умолчанию stdout)")
+    parser.add_argument('--format', choices=FORMATS,
+                        help="Формат результатов; по умолчанию по расширению файла, иначе csv")
+    parser.add_argument('-w', '--workers', type=int, default=BATCH_MAX_WORKERS, help="Число одновременных поисков")
+    parser.add_argument('--cost-modifier', type=float, help="Модификатор стоимости за килограмм")
+    parser.add_argument('--exchange-rate', type=float, default=EXCHANGE_RATE, help="Курс USD в рублях")
+    args = parser.parse_args()
+    if args.workers <= 0:
+        parser.error("Число потоков должно быть положительным")
+    if args.format is None:
+        args.format = 'jsonl' if args.output and args.output.endswith(('.jsonl', '.json')) else 'csv'
+    return args
+
+
+def run_batch(args, stdout):
+    """
+    Вход, поиск номеров и сводка
+
+    Args:
+        args: Аргументы командной строки
+        stdout: Поток для результатов, если не задан --output
+    """
+    cost_calculator = CostCalculator()
+    if args.cost_modifier is not None:
+        try:
+            cost_calculator.weight_cost_modifier = args.cost_modifier
+        except ValueError as e:
+            sys.exit(str(e))
+
+    session = GlobbingSession(USERNAME, PASSWORD)
+    if not session._login():
+        logging.error("Login failed")
+        sys.exit("Не удалось войти на сайт")
+
+    order_store = OrderStore()
+    response_cache = ResponseCache()
+    tracking_service = TrackingService(
+        session.request_wrapper, order_store=order_store, response_cache=response_cache
+    )
+    runner = BatchRunner(
+        tracking_service, cost_calculator, PriceService(args.exchange_rate),
+        FinderCache(finder, maxsize=FINDER_CACHE_SIZE)
+    )
+
+    output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else stdout
+    started = time.monotonic()
+    try:
+        runner.run(read_numbers(args.inputs), make_writer(output, args.format), args.workers)
+    except KeyboardInterrupt:
+        print("Прервано, записаны уже готовые результаты", file=sys.stderr)
+    finally:
+        elapsed = time.monotonic() - started
+        if output is not stdout:
+            output.close()
+        session.stop_keep_alive()
+        order_store.close()
+        response_cache.close()
+        summary = format_summary(runner.counts, elapsed)
+        logging.info(summary)
+        print(summary, file=sys.stderr)
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+    # В stdout пишутся только строки результата. Всё, что печатается по ходу
+    # работы, в том числе при повторном входе из потоков поиска, уходит в stderr
+    stdout = sys.stdout
+    with redirect_stdout(sys.stderr):
+        run_batch(args, stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Сравнение пакетного расчёта bulk_pricing с построчными CostCalculator
+и PriceService на строках в формате страницы заказа.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_bulk_pricing
+"""
+import math
+import random
+import timeit
+
+from bulk_pricing import calculate_report
+from cost_calculator import CostCalculator
+from price_service import PriceService
+
+ROWS = (1000, 10000, 100000)
+EXCHANGE_RATE = 100
+
+
+def make_rows(count, seed=0):
+    """Веса и цены как на страницах заказов, с долей пустых и битых значений"""
+    rng = random.Random(seed)
+    weights, prices = [], []
+    for _ in range(count):
+        weight = f"{rng.randint(1, 300) / 10:g}".replace(".", ",")
+        weights.append(rng.choice((f"{weight} кг", f"{weight} кг", f"{weight} кг", "", "н/д")))
+        prices.append(rng.choice((f"{rng.randint(100, 50000) / 100:.2f} $", f"{rng.randint(1, 500)} $", None)))
+    return weights, prices
+
+
+def per_row(weights, prices, calculator, price_service):
+    """Прежний способ: разбор каждой строки отдельно"""
+    costs, rubs = [], []
+    for weight, price in zip(weights, prices):
+        try:
+            costs.append(calculator.calculate_cost(weight))
+        except ValueError:
+            costs.append(math.nan)
+        rubs.append(price_service.convert_to_rub(price)[1])
+    return costs, rubs
+
+
+def check_parity(weights, prices, calculator, price_service):
+    costs, rubs = per_row(weights, prices, calculator, price_service)
+    report = calculate_report(weights, prices, calculator.weight_cost_modifier, EXCHANGE_RATE)
+    for index, (cost, rub) in enumerate(zip(costs, rubs)):
+        bulk_cost = report['cost'][index]
+        if not (cost == bulk_cost or (math.isnan(cost) and report['weight_error'][index])):
+            raise AssertionError(f"cost {weights[index]!r}: {cost} != {bulk_cost}")
+        # convert_to_rub возвращает 0 для строк, которые не удалось разобрать
+        bulk_rub = 0.0 if report['price_error'][index] else report['price_rub'][index]
+        if rub != bulk_rub:
+            raise AssertionError(f"price {prices[index]!r}: {rub} != {bulk_rub}")
+
+
+def bench(func):
+    """Лучшее время одного вызова в миллисекундах"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number * 1000
+
+
+def main():
+    calculator = CostCalculator()
+    price_service = PriceService(EXCHANGE_RATE)
+    check_parity(*make_rows(20000, seed=1), calculator, price_service)
+    print("Parity OK")
+
+    print(f"{'rows':>8} {'per row, ms':>12} {'bulk, ms':>10} {'speedup':>8}")
+    for count in ROWS:
+        weights, prices = make_rows(count)
+        old = bench(lambda: per_row(weights, prices, calculator, price_service))
+        new = bench(lambda: calculate_report(weights, prices, calculator.weight_cost_modifier, EXCHANGE_RATE))
+        print(f"{count:>8} {old:>12.2f} {new:>10.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Сравнение однопроходного finder с прежним перебором суффиксов.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_finder
+"""
+import random
+import string
+import timeit
+
+from tracking_info import finder, finder_by_suffixes, get_scanner
+
+LENGTHS = (13, 18, 22, 50, 100, 200, 500, 1000, 2000)  # 13-22 - обычные сканы без шума
+TRACKING_NUMBERS = ("1Z999AA10123456784", "RR123456785US", "9400111899223344556677")
+
+
+def make_input(length, seed=0):
+    """Строка заданной длины: шум из этикетки и трек-номер в конце"""
+    rng = random.Random(seed + length)
+    number = rng.choice(TRACKING_NUMBERS)
+    noise_length = max(length - len(number), 0)
+    noise = "".join(rng.choice(string.ascii_lowercase + string.digits) for _ in range(noise_length))
+    return (noise + number)[-length:]
+
+
+def bench(func, text):
+    """Среднее время одного вызова в миллисекундах"""
+    timer = timeit.Timer(lambda: func(text))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=3, number=number))
+    return best / number * 1000
+
+
+def main():
+    get_scanner()  # Компиляция выражения не входит в замер
+    print(f"{'length':>8} {'suffix loop, ms':>16} {'scanner, ms':>12} {'speedup':>8}")
+    for length in LENGTHS:
+        text = make_input(length)
+        assert finder(text) == finder_by_suffixes(text)
+        old = bench(finder_by_suffixes, text)
+        new = bench(finder, text)
+        print(f"{length:>8} {old:>16.3f} {new:>12.3f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
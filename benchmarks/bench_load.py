@@ -0,0 +1,277 @@
+"""
+Нагрузочный замер сетевых путей на локальной замене сайта.
+
+Запускает FakeGlobbing и гоняет через него настоящий код: поиск и загрузку
+страниц заказов TrackingService, выгрузку истории hui.get_all_orders и вход
+GlobbingSession (восстановление сохранённой сессии и полный вход, токен
+reCAPTCHA подставляется без Chrome). Запросы к https://kz.globbing.com
+перенаправляет адаптер requests, поэтому URL в коде не меняются.
+
+Для каждого числа потоков печатаются пропускная способность, процентили
+задержки одной операции и число запросов по адресам сервера. Результаты
+дописываются в файл JSON Lines, чтобы сравнивать прогоны между изменениями.
+Сценарии, для которых не установлены зависимости (selenium, config.py для
+hui), пропускаются.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_load --concurrency 1,4,8,16 --latency 0.05
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from benchmarks.fake_globbing import FakeGlobbing, SITE_URL
+from circuit_breaker import CircuitBreaker
+from rate_limiter import TokenBucket
+from request_coalescer import RequestCoalescer
+from request_wrapper import RequestWrapper
+from retry_policy import RetryPolicy
+from tracing import percentile
+from tracking_service import TrackingService
+
+DEFAULT_OUTPUT = 'bench_load_results.jsonl'
+UNLIMITED_RATE = 1e9
+SCENARIOS = ('tracking', 'orders', 'restore', 'login')
+
+
+class LocalSiteAdapter(HTTPAdapter):
+    """Отправляет запросы к SITE_URL на локальный сервер, оставляя исходный URL в ответе"""
+
+    def __init__(self, base_url, pool_maxsize):
+        self._base_url = base_url
+        super().__init__(pool_connections=1, pool_maxsize=pool_maxsize)
+
+    def send(self, request, **kwargs):
+        local_request = request.copy()
+        local_request.url = self._base_url + request.url[len(SITE_URL):]
+        response = super().send(local_request, **kwargs)
+        # Cookies и редиректы requests разбирает по исходному адресу
+        response.url = request.url
+        response.request = request
+        return response
+
+
+class LoadBench:
+    def __init__(self, fake, args):
+        self.fake = fake
+        self.args = args
+        self.pool_size = max(args.concurrency)
+
+    def mount(self, session):
+        session.mount(SITE_URL, LocalSiteAdapter(self.fake.base_url, self.pool_size))
+        return session
+
+    def make_wrapper(self, session=None, auth_handler=None):
+        """
+        RequestWrapper со своими ограничителем и автоматом защиты на каждый прогон,
+        чтобы прогоны не влияли друг на друга через общие get_host_guards
+        """
+        rate = self.args.rate_limit or UNLIMITED_RATE
+        return RequestWrapper(
+            self.mount(session or requests.Session()),
+            auth_handler=auth_handler,
+            retry_policy=RetryPolicy(base_delay=self.args.retry_delay),
+            rate_limiter=TokenBucket(rate, max(1, min(rate, self.pool_size))),
+            circuit_breaker=CircuitBreaker()
+        )
+
+    def run(self, scenario, workers, operations, func):
+        """
+        Выполняет func(i) для каждой операции в workers потоках
+
+        Returns:
+            dict: Запись результата прогона
+        """
+        self.fake.reset_counts()
+        latencies = []
+        errors = 0
+
+        def timed(index):
+            started = time.perf_counter()
+            try:
+                func(index)
+                error = None
+            except Exception as e:
+                error = e
+            return time.perf_counter() - started, error
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for latency, error in executor.map(timed, range(operations)):
+                latencies.append(latency * 1000)
+                errors += error is not None
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'scenario': scenario,
+            'concurrency': workers,
+            'operations': operations,
+            'errors': errors,
+            'seconds': round(elapsed, 4),
+            'throughput': round(operations / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'requests': dict(self.fake.counts)
+        }
+
+    def bench_tracking(self, workers):
+        """Поиск и страница заказа для каждого номера, как этапы конвейера TrackingApp"""
+        # Без окна повторов: одинаковые номера в разных прогонах не должны браться из памяти
+        service = TrackingService(self.make_wrapper(), coalescer=RequestCoalescer(window=0))
+        rng = random.Random(workers)
+        numbers = [order['tracking_number'] for order in rng.sample(self.fake.orders, self.args.lookups)]
+
+        def lookup(index):
+            tracking_info = service.fetch_package_info(service.find_listing(numbers[index]))
+            if not tracking_info or not tracking_info.get('weight'):
+                raise LookupError(numbers[index])
+
+        return self.run('tracking', workers, len(numbers), lookup)
+
+    def bench_orders(self, workers):
+        """Выгрузка всей истории заказов; операция - один вызов get_all_orders"""
+        import hui
+        wrapper = self.make_wrapper()
+
+        def load_history(index):
+            if len(hui.get_all_orders(wrapper, max_workers=workers)) != len(self.fake.orders):
+                raise LookupError("incomplete history")
+
+        return self.run('orders', 1, self.args.repeats, load_history) | {'concurrency': workers}
+
+    def make_session(self, cache_path):
+        from session import GlobbingSession
+        from session_cache import SessionCache
+
+        globbing_session = GlobbingSession('bench@example.com', 'bench', session_cache=SessionCache(cache_path))
+        globbing_session.request_wrapper = self.make_wrapper(
+            globbing_session.request_wrapper.get_session(), auth_handler=globbing_session.refresh
+        )
+        # Chrome не запускается: сервер принимает любой токен
+        globbing_session._get_recaptcha_token = lambda login_url: 'fake-recaptcha'
+        return globbing_session
+
+    def bench_session(self, scenario, workers, cache_dir):
+        """
+        Вход GlobbingSession; restore - проверка сохранённых cookies,
+        login - полный вход со страницей входа, POST и редиректом
+        """
+        def login(index):
+            # restore использует cookies, сохранённые заранее для каждого потока
+            key = index % workers if scenario == 'restore' else f'{workers}-{index}'
+            cache_path = os.path.join(cache_dir, f'{scenario}-{key}.json')
+            globbing_session = self.make_session(cache_path)
+            try:
+                if not globbing_session._login():
+                    raise RuntimeError("login failed")
+            finally:
+                globbing_session.stop_keep_alive()
+
+        if scenario == 'restore':
+            for index in range(workers):
+                login(index)  # Сохраняем cookies, которые будут восстанавливаться
+        return self.run(scenario, workers, self.args.logins, login)
+
+    def bench(self, scenario, workers, cache_dir):
+        if scenario == 'tracking':
+            return self.bench_tracking(workers)
+        if scenario == 'orders':
+            return self.bench_orders(workers)
+        return self.bench_session(scenario, workers, cache_dir)
+
+
+def check_scenario(scenario):
+    """
+    Returns:
+        str: Причина пропуска сценария или None
+    """
+    module = {'orders': 'hui', 'restore': 'session', 'login': 'session'}.get(scenario)
+    if module is None:
+        return None
+    try:
+        __import__(module)
+    except ImportError as e:
+        return str(e)
+    return None
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Нагрузочный замер на локальной замене kz.globbing.com")
+    parser.add_argument('--concurrency', type=lambda value: [int(n) for n in value.split(',')], default=[1, 4, 8, 16],
+                        help="Числа потоков через запятую")
+    parser.add_argument('--scenarios', type=lambda value: value.split(','), default=list(SCENARIOS),
+                        help=f"Сценарии через запятую: {', '.join(SCENARIOS)}")
+    parser.add_argument('--orders', type=int, default=500, help="Заказов в истории сервера")
+    parser.add_argument('--latency', type=float, default=0.02, help="Средняя задержка ответа, секунды")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Доля ответов 503")
+    parser.add_argument('--lookups', type=int, default=100, help="Номеров на прогон tracking")
+    parser.add_argument('--repeats', type=int, default=3, help="Выгрузок истории на прогон orders")
+    parser.add_argument('--logins', type=int, default=20, help="Входов на прогон restore и login")
+    parser.add_argument('--rate-limit', type=float, help="Запросов в секунду (по умолчанию без ограничения)")
+    parser.add_argument('--retry-delay', type=float, default=0.05, help="Базовая пауза перед повтором, секунды")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Файл JSON Lines для результатов")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Неизвестные сценарии: {', '.join(sorted(unknown))}")
+    args.lookups = min(args.lookups, args.orders)
+    return args
+
+
+def main():
+    args = parse_args()
+    # Ошибки попыток видны в столбце errors и в числе запросов, журнал их не дублирует
+    logging.disable(logging.CRITICAL)
+    run_info = {
+        'ts': time.time(),
+        'revision': git_revision(),
+        'latency': args.latency,
+        'error_rate': args.error_rate,
+        'orders': args.orders,
+        'rate_limit': args.rate_limit
+    }
+
+    print(f"{'scenario':<10} {'workers':>7} {'ops':>5} {'ops/s':>8} {'p50, ms':>9} {'p95, ms':>9} "
+          f"{'p99, ms':>9} {'errors':>6} {'requests':>8}")
+    with FakeGlobbing(args.orders, args.latency, args.error_rate, args.seed) as fake, \
+            tempfile.TemporaryDirectory() as cache_dir, \
+            open(args.output, 'a', encoding='utf-8') as output:
+        bench = LoadBench(fake, args)
+        for scenario in args.scenarios:
+            skip_reason = check_scenario(scenario)
+            if skip_reason:
+                print(f"{scenario:<10} skipped: {skip_reason}")
+                continue
+            for workers in args.concurrency:
+                result = bench.bench(scenario, workers, cache_dir)
+                requests_total = sum(count for endpoint, count in result['requests'].items() if endpoint != 'errors')
+                print(f"{scenario:<10} {workers:>7} {result['operations']:>5} {result['throughput']:>8.1f} "
+                      f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} "
+                      f"{result['errors']:>6} {requests_total:>8}")
+                output.write(json.dumps(run_info | result, ensure_ascii=False) + '\n')
+    print(f"Results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
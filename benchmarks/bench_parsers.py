@@ -0,0 +1,54 @@
+"""
+Сравнение бэкендов разбора HTML на сохранённых страницах из benchmarks/fixtures.
+
+Совпадение результатов бэкендов с BeautifulSoup проверяет
+tests/test_html_parsers.py. Пиковая память считается через tracemalloc,
+поэтому выделения внутри C-библиотек (lxml, selectolax) в неё не входят.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_parsers
+"""
+import os
+import timeit
+import tracemalloc
+
+from html_parsers import PARSERS, available_parsers
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+CASES = (
+    ('search_result.html', 'parse_search_response'),
+    ('product_page.html', 'extract_weight_and_price'),
+    ('orders_page.html', 'parse_orders_table'),
+)
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def measure(func, html):
+    """Время одного разбора в миллисекундах и пиковая память в КБ"""
+    timer = timeit.Timer(lambda: func(html))
+    number, _ = timer.autorange()
+    elapsed = min(timer.repeat(repeat=3, number=number)) / number * 1000
+
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+
+def main():
+    parsers = {name: PARSERS[name]() for name in available_parsers()}
+    print(f"{'page':<20} {'backend':<11} {'time, ms':>9} {'peak, KB':>9}")
+    for fixture, method in CASES:
+        html = load_fixture(fixture)
+        for name, parser in parsers.items():
+            elapsed, peak = measure(getattr(parser, method), html)
+            print(f"{fixture:<20} {name:<11} {elapsed:>9.3f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Задержка перевода раскладки на одно нажатие клавиши.
+
+Сравнивается прежний перевод всего поля (словарь на каждый вызов и сборка
+строки по символу), str.translate всего поля и перевод только изменённого
+участка, как это делает TrackingApp.translate_input.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_translator
+"""
+import random
+import timeit
+
+from translator import RUS_TO_ENG, translate_rus_to_eng, translate_changed_span
+
+LENGTHS = (10, 50, 200, 1000, 5000)
+ALPHABET = "0123456789ABCDEFGHJKLMNPRSTUVWXYZ"
+
+
+def translate_by_loop(text):
+    """Прежняя реализация translate_rus_to_eng"""
+    rus_to_eng = dict(RUS_TO_ENG)
+    translated = ''
+    for c in text:
+        translated += rus_to_eng.get(c, c)
+    return translated
+
+
+def make_keystroke(length, seed=0):
+    """Текст поля до и после нажатия: в конец дописана буква в русской раскладке"""
+    rng = random.Random(seed + length)
+    before = "".join(rng.choice(ALPHABET) for _ in range(length))
+    return before, before + "к"
+
+
+def bench(func):
+    """Лучшее время одного вызова в микросекундах"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number * 1e6
+
+
+def main():
+    print(f"{'length':>8} {'loop, us':>10} {'translate, us':>14} {'span, us':>10}")
+    for length in LENGTHS:
+        before, after = make_keystroke(length)
+        start, end, translated = translate_changed_span(before, after)
+        assert after[:start] + translated + after[end:] == translate_by_loop(after) == translate_rus_to_eng(after)
+        loop = bench(lambda: translate_by_loop(after))
+        full = bench(lambda: translate_rus_to_eng(after))
+        span = bench(lambda: translate_changed_span(before, after))
+        print(f"{length:>8} {loop:>10.2f} {full:>14.2f} {span:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
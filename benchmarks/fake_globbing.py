@@ -0,0 +1,230 @@
+"""
+Локальная замена kz.globbing.com для нагрузочных замеров.
+
+Сервер отдаёт таблицы полученных заказов (постранично и с поиском),
+страницы заказов sale-order/view/<id>, страницу и запрос входа и страницу
+профиля. Разметка строится из сохранённых страниц benchmarks/fixtures,
+поэтому её разбирают те же парсеры, что и настоящие ответы. Задержку,
+долю ответов 503 и число заказов можно настроить.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+SITE_URL = 'https://kz.globbing.com'
+FIRST_ORDER_NUMBER = 4471093
+SESSION_COOKIE = 'globbing_session'
+TRACKING_PREFIXES = ('1Z', 'TBA', 'RR', 'LP', '')
+
+_ROW_TEMPLATE = '''        <tr class="orders-table__row">
+            <td class="orders-table__col"><input type="checkbox" name="orders[]" value="{order_number}"></td>
+            <td class="orders-table__col"><span class="fs12">{order_number}</span><br><span class="fs12">2025-01-26</span></td>
+            <td class="orders-table__col track-number__col--out"><a href="{site}/ru/sale-order/view/{order_number}" title="{tracking_number}">
+                {tracking_number}
+            </a></td>
+            <td class="orders-table__col"><span class="badge badge--success">Получен</span></td>
+            <td class="orders-table__col"><p class="fs14">{weight} кг</p></td>
+        </tr>
+'''
+_LOGIN_PAGE = '''<!DOCTYPE html><html lang="ru"><body><form method="post" action="/ru/login/">
+<input type="hidden" name="_token" value="fake-csrf-token">
+<textarea id="g-recaptcha-response" name="g-recaptcha-response">fake-recaptcha</textarea>
+</form></body></html>'''
+
+
+def _load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def _split_orders_page(html):
+    """Части страницы заказов до и после строк таблицы"""
+    start = html.index('<tr class="orders-table__row">')
+    end = html.index('</tbody>', start)
+    # Отступ перед первой строкой остаётся в начале
+    start = html.rindex('\n', 0, start) + 1
+    return html[:start], html[end:]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # При очереди по умолчанию (5) одновременные подключения теряются и ждут повтора SYN секунду
+    request_queue_size = 128
+
+
+class FakeGlobbing:
+    """
+    HTTP сервер в отдельном потоке
+
+    Args:
+        orders: Число заказов в истории
+        latency: Средняя задержка ответа в секундах (от 0.5 до 1.5 значения)
+        error_rate: Доля ответов 503
+        seed: Начальное значение генератора заказов и ошибок
+    """
+
+    def __init__(self, orders=500, latency=0.02, error_rate=0.0, seed=0, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.counts = Counter()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._counts_lock = threading.Lock()
+        self.orders = self._make_orders(orders)
+        self._orders_by_tracking = {order['tracking_number']: order for order in self.orders}
+        self._orders_by_number = {order['order_number']: order for order in self.orders}
+        self._page_head, self._page_tail = _split_orders_page(_load_fixture('orders_page.html'))
+        self._product_page = _load_fixture('product_page.html')
+        self._server = _Server((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_orders(self, count):
+        orders = []
+        for index in range(count):
+            prefix = self._rng.choice(TRACKING_PREFIXES)
+            digits = ''.join(self._rng.choice('0123456789') for _ in range(16 - len(prefix)))
+            weight = self._rng.randint(1, 300) / 10
+            orders.append({
+                'order_number': str(FIRST_ORDER_NUMBER - index),
+                'tracking_number': prefix + digits,
+                'weight': f"{weight:g}".replace('.', ','),
+                'price_usd': f"{weight * 7.5:.2f}"
+            })
+        return orders
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-globbing', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def reset_counts(self):
+        with self._counts_lock:
+            self.counts.clear()
+
+    def _count(self, endpoint):
+        with self._counts_lock:
+            self.counts[endpoint] += 1
+
+    def _delay_and_fail(self):
+        """Задержка ответа; True, если этот ответ должен быть ошибкой 503"""
+        with self._rng_lock:
+            delay = self.latency * self._rng.uniform(0.5, 1.5)
+            failed = self._rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return failed
+
+    def render_orders(self, orders):
+        rows = ''.join(
+            _ROW_TEMPLATE.format(site=SITE_URL, **order) for order in orders
+        )
+        return self._page_head + rows + self._page_tail
+
+    def render_product_page(self, order):
+        html = self._product_page
+        html = re.sub(r'Заказ №\d+', f"Заказ №{order['order_number']}", html)
+        html = html.replace('1ZAR44790309173289', order['tracking_number'])
+        html = html.replace('1,5 кг', f"{order['weight']} кг")
+        return html.replace('11.00 $', f"{order['price_usd']} $")
+
+    def _route(self, method, path, query, cookies):
+        """
+        Returns:
+            tuple: (endpoint, status, content_type, body, дополнительные заголовки)
+        """
+        if path.rstrip('/') == '/ru/login':
+            if method == 'POST':
+                body = json.dumps({'data': {'message': 'globbing.login.success', 'redirect_url': f'{SITE_URL}/ru'}})
+                headers = {'Set-Cookie': f'{SESSION_COOKIE}=fake-session; Path=/; Max-Age=3600'}
+                return 'login_post', 200, 'application/json', body, headers
+            return 'login_page', 200, 'text/html', _LOGIN_PAGE, {}
+        if path.rstrip('/') == '/ru/profile/my-orders':
+            # Без cookie сессии сайт отправляет на страницу входа
+            if SESSION_COOKIE not in cookies:
+                return 'profile', 302, 'text/html', '', {'Location': f'{SITE_URL}/ru/login/'}
+            return 'profile', 200, 'text/html', '<html><body>profile</body></html>', {}
+        if path == '/ru/profile/my-orders/received':
+            search = query.get('search', [None])[0]
+            if search is not None:
+                order = self._orders_by_tracking.get(search.strip())
+                return 'search', 200, 'text/html', self.render_orders([order] if order else []), {}
+            offset = int(query.get('offset', ['0'])[0])
+            limit = int(query.get('limit', ['50'])[0])
+            return 'orders_page', 200, 'text/html', self.render_orders(self.orders[offset:offset + limit]), {}
+        match = re.fullmatch(r'/ru/sale-order/view/(\d+)', path)
+        if match:
+            order = self._orders_by_number.get(match.group(1))
+            if order is None:
+                return 'product_page', 404, 'text/html', 'Not found', {}
+            return 'product_page', 200, 'text/html', self.render_product_page(order), {}
+        if path.rstrip('/') == '/ru':
+            return 'home', 200, 'text/html', '<html><body>home</body></html>', {}
+        return 'other', 404, 'text/html', 'Not found', {}
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Заголовки и тело уходят разными пакетами; с Nagle ответ ждал бы подтверждения клиента
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                parsed = urlparse(self.path)
+                cookies = SimpleCookie(self.headers.get('Cookie', ''))
+                endpoint, status, content_type, body, headers = fake._route(
+                    method, parsed.path, parse_qs(parsed.query), cookies
+                )
+                fake._count(endpoint)
+                if fake._delay_and_fail():
+                    fake._count('errors')
+                    status, content_type, body, headers = 503, 'text/plain', 'Service Unavailable', {}
+                encoded = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+                self.send_header('Content-Length', str(len(encoded)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if method != 'HEAD':
+                    self.wfile.write(encoded)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_HEAD(self):
+                self._handle('HEAD')
+
+            def do_POST(self):
+                self._handle('POST')
+
+        return Handler
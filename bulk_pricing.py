@@ -0,0 +1,117 @@
+"""
+Пакетный расчёт стоимости и цены для отчётов по всем заказам.
+
+Строки веса и цены ("1,5 кг", "11.00 $") разбираются целиком массивами NumPy:
+текст переводится в матрицу кодов символов, число в начале строки
+собирается из цифр как целая мантисса и делится на степень десяти, поэтому
+результат совпадает с float() для тех же цифр. Строки, которые не удалось
+разобрать, отмечаются в маске ошибок, их значения - NaN.
+"""
+import numpy as np
+
+MAX_DIGITS = 15  # Больше цифр не помещается в мантиссу float без потерь
+
+_DIGIT_0 = ord('0')
+_DIGIT_9 = ord('9')
+_SEPARATORS = (ord('.'), ord(','))
+_SPACES = (ord(' '), ord('\t'), ord('\xa0'))
+_POWERS_OF_TEN = 10 ** np.arange(MAX_DIGITS, dtype=np.int64)
+
+
+def parse_amounts(values):
+    """
+    Разбирает числа в начале строк вида "1,5 кг" или "11.00 $"
+
+    Args:
+        values: Последовательность строк; None и пустые строки считаются ошибками
+
+    Returns:
+        tuple: (numpy.ndarray float64 значений, numpy.ndarray bool маски ошибок)
+    """
+    text = np.asarray(values, dtype=np.str_)
+    count = len(text)
+    width = text.dtype.itemsize // 4
+    if count == 0 or width == 0:
+        return np.full(count, np.nan), np.ones(count, dtype=bool)
+
+    # Матрица кодов символов: столбец - строка текста, дополненная нулями.
+    # Цикл идёт по позициям символов (их не больше длины самой длинной
+    # строки), каждая операция внутри выполняется сразу для всех строк.
+    codes = np.ascontiguousarray(text).view(np.uint32).reshape(count, width).T.astype(np.int32)
+    leading_space = np.ones(count, dtype=bool)
+    in_number = np.ones(count, dtype=bool)
+    seen_separator = np.zeros(count, dtype=bool)
+    trailing_numeric = np.zeros(count, dtype=bool)
+    digit_count = np.zeros(count, dtype=np.int32)
+    separator_count = np.zeros(count, dtype=np.int32)
+    fraction_digits = np.zeros(count, dtype=np.int32)
+    mantissa = np.zeros(count, dtype=np.int64)
+
+    for code in codes:
+        digit = code - _DIGIT_0
+        is_digit = (code >= _DIGIT_0) & (code <= _DIGIT_9)
+        is_separator = (code == _SEPARATORS[0]) | (code == _SEPARATORS[1])
+        leading_space &= (code == _SPACES[0]) | (code == _SPACES[1]) | (code == _SPACES[2])
+
+        # Число - цифры и разделители после начальных пробелов до первого другого символа
+        in_number &= leading_space | is_digit | is_separator
+        number_digit = in_number & is_digit
+        number_separator = in_number & is_separator
+        # Цифры после единицы измерения, например "1 кг 2", делают строку неоднозначной
+        trailing_numeric |= ~in_number & (is_digit | is_separator)
+
+        digit_count += number_digit
+        separator_count += number_separator
+        fraction_digits += number_digit & seen_separator
+        seen_separator |= number_separator
+        # Мантисса по схеме Горнера: цифры числа без разделителя как целое
+        mantissa = np.where(number_digit, mantissa * 10 + digit, mantissa)
+
+    errors = (digit_count == 0) | (digit_count > MAX_DIGITS) | (separator_count > 1) | trailing_numeric
+    amounts = mantissa / _POWERS_OF_TEN[np.minimum(fraction_digits, MAX_DIGITS - 1)]
+    amounts[errors] = np.nan
+    return amounts, errors
+
+
+def calculate_costs(weights, weight_cost_modifier):
+    """
+    Стоимость доставки для столбца весов, как CostCalculator.calculate_cost
+
+    Returns:
+        tuple: (стоимости, маска ошибок разбора веса)
+    """
+    weight_values, errors = parse_amounts(weights)
+    return weight_values * weight_cost_modifier, errors
+
+
+def convert_to_rub(prices, exchange_rate):
+    """
+    Цены в USD и рублях для столбца цен, как PriceService.convert_to_rub
+
+    Returns:
+        tuple: (цены в USD, цены в рублях, маска ошибок разбора цены)
+    """
+    usd_values, errors = parse_amounts(prices)
+    return usd_values, usd_values * exchange_rate, errors
+
+
+def calculate_report(weights, prices, weight_cost_modifier, exchange_rate):
+    """
+    Стоимость и цены для всех строк отчёта
+
+    Args:
+        weights: Строки веса, например из OrderStore или со страниц заказов
+        prices: Строки цены в USD той же длины
+
+    Returns:
+        dict: Массивы cost, price_usd, price_rub и маски weight_error, price_error
+    """
+    cost, weight_error = calculate_costs(weights, weight_cost_modifier)
+    price_usd, price_rub, price_error = convert_to_rub(prices, exchange_rate)
+    return {
+        'cost': cost,
+        'price_usd': price_usd,
+        'price_rub': price_rub,
+        'weight_error': weight_error,
+        'price_error': price_error
+    }
@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+from collections import deque
+
+import requests
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+TRANSITION_LOG_SIZE = 100
+
+
+class CircuitOpenError(requests.RequestException):
+    """Сервер недоступен: запросы временно не отправляются"""
+
+
+class CircuitBreaker:
+    """
+    Автомат защиты для запросов к одному серверу.
+
+    После failure_threshold неудач подряд цепь размыкается, и запросы сразу
+    завершаются CircuitOpenError, не нагружая сервер повторами. Через
+    recovery_timeout секунд пропускается пробный запрос: успех замыкает
+    цепь, неудача снова размыкает её.
+    """
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30, clock=time.monotonic, on_state_change=None):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._on_state_change = on_state_change
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started_at = None
+        self._lock = threading.Lock()
+        self.transition_counts = {}
+        self.transitions = deque(maxlen=TRANSITION_LOG_SIZE)
+        self.rejected = 0
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def _current_state(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._set_state(HALF_OPEN, now)
+        return self._state
+
+    def _set_state(self, state, now):
+        if state == self._state:
+            return
+        transition = f"{self._state}->{state}"
+        self.transition_counts[transition] = self.transition_counts.get(transition, 0) + 1
+        self.transitions.append((time.time(), self._state, state))
+        self._logger.warning(f"Circuit {transition}")
+        self._state = state
+        if state == OPEN:
+            self._opened_at = now
+        if state != HALF_OPEN:
+            self._probe_started_at = None
+        if self._on_state_change:
+            self._on_state_change(transition)
+
+    def before_call(self):
+        """
+        Проверяет, можно ли отправить запрос
+
+        Raises:
+            CircuitOpenError: Если цепь разомкнута или пробный запрос уже отправлен
+        """
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return
+            # Пробный запрос, который так и не завершился, через recovery_timeout считается потерянным
+            if state == HALF_OPEN and (
+                self._probe_started_at is None or now - self._probe_started_at >= self.recovery_timeout
+            ):
+                self._probe_started_at = now
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.recovery_timeout - (now - self._opened_at))
+            raise CircuitOpenError(f"Circuit is open, retry in {retry_in:.0f} s")
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._set_state(CLOSED, self._clock())
+
+    def record_failure(self):
+        with self._lock:
+            now = self._clock()
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._set_state(OPEN, now)
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'failures': self._failures,
+            'rejected': self.rejected,
+            'transitions': dict(self.transition_counts)
+        }
@@ -1,3 +1,9 @@
+import re
+
+# Число в начале строки, как в price_service: "1,5 кг", "1,5кг", "2 kg"
+_LEADING_NUMBER_RE = re.compile(r'\s*([\d.,]+)')
+
+
 class CostCalculator:
     def __init__(self):
         self._weight_cost_modifier = 1470
@@ -26,8 +32,12 @@ class CostCalculator:
         Returns:
             float: Рассчитанная стоимость
         """
+        # Пробел перед единицей измерения необязателен
+        match = _LEADING_NUMBER_RE.match(weight_str)
+        if not match:
+            raise ValueError("Неверный формат веса")
         try:
-            weight_value = float(weight_str.split()[0].replace(",", "."))
-            return weight_value * self.weight_cost_modifier
-        except (ValueError, IndexError) as e:
+            weight_value = float(match.group(1).replace(",", "."))
+        except ValueError as e:
             raise ValueError("Неверный формат веса") from e
+        return weight_value * self.weight_cost_modifier
@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+
+
+class FinderCache:
+    """LRU-кэш результатов finder со счётчиками попаданий, промахов и вытеснений"""
+
+    def __init__(self, finder_func, maxsize=256):
+        if maxsize <= 0:
+            raise ValueError("Размер кэша должен быть положительным числом")
+        self._finder_func = finder_func
+        self._maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def __call__(self, row_track):
+        """
+        Возвращает результат finder для строки, используя кэш
+
+        Args:
+            row_track: Исходная строка с трек-номером
+
+        Returns:
+            str: Найденный трек-номер или None
+        """
+        with self._lock:
+            if row_track in self._cache:
+                self._cache.move_to_end(row_track)
+                self.hits += 1
+                return self._cache[row_track]
+            self.misses += 1
+
+        result = self._finder_func(row_track)
+
+        with self._lock:
+            self._cache[row_track] = result
+            self._cache.move_to_end(row_track)
+            while len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        """Очищает кэш и сбрасывает счётчики"""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        Возвращает статистику использования кэша
+
+        Returns:
+            dict: hits, misses, evictions, size, maxsize и hit_rate
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._cache),
+                'maxsize': self._maxsize,
+                'hit_rate': self.hits / total if total else 0.0
+            }
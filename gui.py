@@ -1,16 +1,28 @@
 import tkinter as tk
 import logging
 from tracking_info import finder
+from finder_cache import FinderCache
 from config import USERNAME, PASSWORD, EXCHANGE_RATE
 from cost_calculator import CostCalculator
 from logger import setup_logging
 from messages import WEIGHT_AND_COST_MESSAGE, PAYMENT_MESSAGE
 from session import GlobbingSession
-from translator import translate_rus_to_eng
+from request_wrapper import SessionExpiredError
+from translator import translate_changed_span
 from tracking_service import TrackingService
+from order_store import OrderStore
+from response_cache import ResponseCache
 from price_service import PriceService
 from ui_manager import UIManager
 from clipboard_manager import ClipboardManager
+from lookup_worker import LookupWorker
+from scan_stats import ScanStats
+from tracing import span
+
+FINDER_CACHE_SIZE = 512
+TRANSLATE_AUTO_DETECT = True  # Не переводить вставленный русский текст
+STATUS_REFRESH_MS = 1000
+
 
 class TrackingApp:
     def __init__(self, root):
@@ -19,18 +31,26 @@ class TrackingApp:
         
         # Инициализация сервисов
         self.session = GlobbingSession(USERNAME, PASSWORD)
-        self.tracking_service = TrackingService(self.session.request_wrapper)
+        self.order_store = OrderStore()
+        self.response_cache = ResponseCache()
+        self.tracking_service = TrackingService(
+            self.session.request_wrapper, order_store=self.order_store, response_cache=self.response_cache
+        )
         self.price_service = PriceService(EXCHANGE_RATE)
         self.cost_calculator = CostCalculator()
+        self.finder = FinderCache(finder, maxsize=FINDER_CACHE_SIZE)
         
         # Инициализация менеджеров
         self.ui_manager = UIManager(root)
         self.clipboard_manager = ClipboardManager(root)
-        
-        # Инициализация сообщения
-        self.message = None
+        self.lookup_worker = LookupWorker(root)
+        self.scan_stats = ScanStats()
+        self.pending = {}
+        self._entry_text = ""
         
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self._refresh_status()
         self._login()
 
     def _login(self):
@@ -50,14 +70,11 @@ class TrackingApp:
             self.translate_input
         )
         
-        # Настройка отображения информации
-        self.ui_manager.setup_tracking_display()
-        
-        # Настройка кнопок копирования
-        self.ui_manager.setup_copy_buttons(
-            self.copy_tracking_number_to_clipboard,
-            self.copy_message_to_clipboard
-        )
+        # Список трек-номеров в обработке
+        self.ui_manager.setup_pending_list()
+
+        # Строки результатов с кнопками копирования
+        self.ui_manager.setup_results_list()
         
         # Настройка модификатора стоимости
         self.ui_manager.setup_cost_modifier(
@@ -65,6 +82,9 @@ class TrackingApp:
             self.update_cost_modifier
         )
 
+        # Строка состояния: очередь, сканы в минуту, задержки
+        self.ui_manager.setup_status_bar()
+
     def paste(self, event):
         """Обработчик вставки из буфера обмена"""
         text = self.clipboard_manager.paste_from_clipboard()
@@ -73,13 +93,20 @@ class TrackingApp:
         return "break"
 
     def translate_input(self, event):
-        """Обработчик перевода текста"""
-        current_text = self.ui_manager.get_entry_text()
-        translated_text = translate_rus_to_eng(current_text)
-        if current_text != translated_text:
-            entry = self.ui_manager.widgets['entry']
-            entry.delete(0, tk.END)
-            entry.insert(0, translated_text)
+        """Обработчик перевода текста: переводит только набранный или вставленный участок"""
+        entry = self.ui_manager.widgets['entry']
+        current_text = entry.get()
+        with span('translate_input', length=len(current_text)):
+            change = translate_changed_span(self._entry_text, current_text, TRANSLATE_AUTO_DETECT)
+        if change:
+            start, end, translated = change
+            if translated != current_text[start:end]:
+                cursor = entry.index(tk.INSERT)
+                entry.delete(start, end)
+                entry.insert(start, translated)
+                entry.icursor(cursor)
+                current_text = current_text[:start] + translated + current_text[end:]
+        self._entry_text = current_text
 
     def submit_tracking_number(self, event=None):
         """Обработка отправки трек-номера"""
@@ -89,23 +116,81 @@ class TrackingApp:
             return
 
         logging.info(f"Tracking number submitted: {tracking_number}")
-        self.ui_manager.update_tracking_label(f"Entered Tracking Number: {tracking_number}")
         self.ui_manager.widgets['entry'].delete(0, tk.END)
 
-        # Получаем информацию о посылке
-        tracking_info, tracking_number_text = self.tracking_service.process_tracking_number(
-            tracking_number, finder
+        # Получаем информацию о посылке на конвейере: поиск, страница заказа и finder
+        job_id = self.lookup_worker.submit(
+            [self._search_stage, self._package_info_stage],
+            {'input': tracking_number},
+            on_done=lambda scan, latency: self._handle_lookup_result(job_id, scan, latency),
+            on_error=lambda error: self._handle_lookup_error(job_id, tracking_number, error)
         )
+        self.pending[job_id] = tracking_number
+        self.ui_manager.update_pending_list(list(self.pending.values()))
+        self._refresh_status(reschedule=False)
+
+    def _search_stage(self, scan):
+        """Этап конвейера: поиск в локальной базе или на сайте"""
+        tracking_number = scan['input'].strip()
+        try:
+            tracking_info = self.tracking_service.find_listing(tracking_number)
+        except SessionExpiredError:
+            raise  # Не показываем "не найдено", если не удалось войти
+        except Exception as e:
+            logging.error(f"Error searching tracking number: {e}")
+            tracking_info = None
+        return dict(scan, tracking_number=tracking_number, tracking_info=tracking_info)
+
+    def _package_info_stage(self, scan):
+        """Этап конвейера: страница заказа и выбор трек-номера"""
+        tracking_info = self.tracking_service.fetch_package_info(scan['tracking_info'])
+        with span('finder'):
+            result = self.tracking_service.resolve_tracking_number(scan['tracking_number'], tracking_info, self.finder)
+        return dict(scan, result=result)
+
+    def _finish_lookup(self, job_id, latency=None):
+        """Убирает трек-номер из списка в обработке"""
+        self.pending.pop(job_id, None)
+        self.ui_manager.update_pending_list(list(self.pending.values()))
+        if latency is not None:
+            self.scan_stats.record(latency)
+        self._refresh_status(reschedule=False)
+
+    def _handle_lookup_error(self, job_id, tracking_number, error):
+        """Обработка ошибки фонового поиска"""
+        self._finish_lookup(job_id)
+        logging.error(f"Error processing tracking number {tracking_number}: {error}")
+        self.ui_manager.add_result_row(
+            None, tracking_number, "Failed to process the tracking number.", None, self.copy_to_clipboard
+        )
+
+    def _handle_lookup_result(self, job_id, scan, latency):
+        """Обработка результата фонового поиска в потоке Tk"""
+        self._finish_lookup(job_id, latency)
+        tracking_info, tracking_number_text = scan['result']
+        logging.info(f"Lookup finished in {latency:.3f} s, finder cache stats: {self.finder.stats()}")
 
         if tracking_info and tracking_info.get('weight'):
             self._handle_successful_search(tracking_info, tracking_number_text)
         elif tracking_number_text:
             self._handle_finder_only(tracking_number_text)
         else:
-            self.ui_manager.show_error(
-                "Error", "Failed to process the tracking number."
+            self.ui_manager.add_result_row(
+                None, scan['input'], "Failed to process the tracking number.", None, self.copy_to_clipboard
             )
 
+    def _refresh_status(self, reschedule=True):
+        """Обновление строки состояния"""
+        p50 = self.scan_stats.percentile(50)
+        p95 = self.scan_stats.percentile(95)
+        latency_text = f"p50: {p50 * 1000:.0f} мс, p95: {p95 * 1000:.0f} мс" if p50 is not None else "p50: —, p95: —"
+        self.ui_manager.update_status_bar(
+            f"Очередь: {len(self.pending)} | "
+            f"Сканов в минуту: {self.scan_stats.scans_per_minute():.0f} | {latency_text}"
+        )
+        if reschedule:
+            self.root.after(STATUS_REFRESH_MS, self._refresh_status)
+
     def _handle_successful_search(self, tracking_info, tracking_number_text):
         """Обработка успешного поиска"""
         weight = tracking_info['weight']
@@ -118,16 +203,8 @@ class TrackingApp:
         # Форматирование цены
         price_text, price_rub = self.price_service.format_price(price_usd)
 
-        # Обновление UI
-        self.ui_manager.update_weight_cost_label(
-            WEIGHT_AND_COST_MESSAGE.format(
-                weight=weight, cost=cost, 
-                price_usd=price_usd, price_rub=price_rub
-            )
-        )
-
-        # Сохранение сообщения для копирования
-        self.message = PAYMENT_MESSAGE.format(cost=cost)
+        # Сообщение для копирования
+        message = PAYMENT_MESSAGE.format(cost=cost)
 
         # Логирование
         logging.info(
@@ -138,30 +215,46 @@ class TrackingApp:
             f"Link: {tracking_info['product_page_link']}"
         )
 
-        # Обновление полей с трек-номерами
-        self.ui_manager.update_tracking_fields(
+        # Строка результата
+        self.ui_manager.add_result_row(
             tracking_number_text or "",
-            raw_tracking_number
+            raw_tracking_number,
+            WEIGHT_AND_COST_MESSAGE.format(
+                weight=weight, cost=cost, 
+                price_usd=price_usd, price_rub=price_rub
+            ),
+            message,
+            self.copy_to_clipboard
         )
         
         # Копируем трек-номер
-        self.copy_tracking_number_to_clipboard()
+        if tracking_number_text:
+            self.copy_to_clipboard(tracking_number_text)
 
     def _handle_finder_only(self, tracking_number_text):
         """Обработка случая, когда сработал только finder"""
-        self.ui_manager.update_tracking_fields(tracking_number_text, "")
-        self.copy_tracking_number_to_clipboard()
-
-    def copy_message_to_clipboard(self):
-        """Копирование сообщения в буфер обмена"""
-        self.clipboard_manager.copy_to_clipboard(self.message)
-        self.ui_manager.update_copy_button_text('copy_message_button', "Copied")
-
-    def copy_tracking_number_to_clipboard(self):
-        """Копирование трек-номера в буфер обмена"""
-        tracking_number = self.ui_manager.get_tracking_field_text()
-        self.clipboard_manager.copy_to_clipboard(tracking_number)
-        self.ui_manager.update_copy_button_text('copy_track_button', "Copied")
+        self.ui_manager.add_result_row(
+            tracking_number_text, "", "Not found on Globbing", None, self.copy_to_clipboard
+        )
+        self.copy_to_clipboard(tracking_number_text)
+
+    def copy_to_clipboard(self, text):
+        """Копирование текста в буфер обмена"""
+        self.clipboard_manager.copy_to_clipboard(text)
+
+    def on_close(self):
+        """
+        Закрытие окна: отменяем поиски, которые ещё не начались, сохраняем
+        сессию для следующего запуска и закрываем базы
+        """
+        self.lookup_worker.shutdown()
+        self.session.stop_keep_alive()
+        self.session.save_session()
+        logging.info(f"Response cache stats: {self.response_cache.stats()}")
+        logging.info(f"Request coalescing stats: {self.tracking_service.coalescer.stats()}")
+        self.order_store.close()
+        self.response_cache.close()
+        self.root.destroy()
 
     def update_cost_modifier(self):
         """Обновление модификатора стоимости"""
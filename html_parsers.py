@@ -0,0 +1,400 @@
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError:  # lxml не установлен
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxHTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxHTMLParser  # selectolax < 0.3
+    except ImportError:  # selectolax не установлен
+        SelectolaxHTMLParser = None
+
+TRACKING_CLASS = 'track-number__col--out'
+FIELD_TITLES = {'Вес': 'weight', 'Стоимость доставки': 'price_usd'}
+DEFAULT_PARSERS = ('selectolax', 'lxml', 'streaming')
+VOID_ELEMENTS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'
+))
+
+
+class SoupParser:
+    """Разбор страниц через BeautifulSoup (html.parser)"""
+
+    name = 'bs4'
+
+    def parse_search_response(self, html_content):
+        """
+        Извлекает трек-номер и ссылку на страницу заказа из результата поиска
+
+        Returns:
+            dict: tracking_number, product_page_link, raw_tracking_number или None
+        """
+        soup = BeautifulSoup(html_content, 'html.parser')
+        tracking_element = soup.select_one(f'.{TRACKING_CLASS} a')
+        if not tracking_element:
+            return None
+        return _tracking_info(tracking_element.get('title'), tracking_element.get('href'), tracking_element.text)
+
+    def extract_weight_and_price(self, html_content):
+        """
+        Извлекает вес и стоимость доставки со страницы заказа
+
+        Returns:
+            dict: weight и price_usd, None для ненайденных значений
+        """
+        soup = BeautifulSoup(html_content, 'html.parser')
+        result = {'weight': None, 'price_usd': None}
+        for title, key in FIELD_TITLES.items():
+            title_element = soup.find("p", class_="fs12", string=title)
+            if title_element:
+                value_element = title_element.find_next("p", class_="fs14")
+                if value_element:
+                    result[key] = value_element.text.strip()
+        return result
+
+    def parse_orders_table(self, html_content):
+        """
+        Извлекает заказы из таблицы полученных заказов
+
+        Returns:
+            list: Кортежи (tracking_number, product_page_link) или None,
+                если в таблице нет строк
+        """
+        soup = BeautifulSoup(html_content, 'html.parser')
+        rows = soup.select('table tbody tr')
+        if not rows:
+            return None
+        orders = []
+        for row in rows:
+            tracking_element = row.select_one(f'.{TRACKING_CLASS} a')
+            if tracking_element:
+                orders.append((tracking_element.get('title'), tracking_element.get('href')))
+        return orders
+
+
+class LxmlParser:
+    """Разбор страниц через lxml.html и XPath"""
+
+    name = 'lxml'
+
+    _TRACKING_XPATH = f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {TRACKING_CLASS} ')]//a"
+    _ROW_TRACKING_XPATH = f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {TRACKING_CLASS} ')]//a"
+    _TITLE_XPATH = "//p[contains(concat(' ', normalize-space(@class), ' '), ' fs12 ')][not(*)][. = $title]"
+    _VALUE_XPATH = "following::p[contains(concat(' ', normalize-space(@class), ' '), ' fs14 ')][1]"
+
+    def __init__(self):
+        if lxml is None:
+            raise ImportError("Для LxmlParser требуется пакет lxml")
+
+    @staticmethod
+    def _parse(html_content):
+        if not html_content or not html_content.strip():
+            return None
+        return lxml.html.document_fromstring(html_content)
+
+    def parse_search_response(self, html_content):
+        tree = self._parse(html_content)
+        if tree is None:
+            return None
+        elements = tree.xpath(self._TRACKING_XPATH)
+        if not elements:
+            return None
+        element = elements[0]
+        return _tracking_info(element.get('title'), element.get('href'), element.text_content())
+
+    def extract_weight_and_price(self, html_content):
+        result = {'weight': None, 'price_usd': None}
+        tree = self._parse(html_content)
+        if tree is None:
+            return result
+        for title, key in FIELD_TITLES.items():
+            title_elements = tree.xpath(self._TITLE_XPATH, title=title)
+            if title_elements:
+                value_elements = title_elements[0].xpath(self._VALUE_XPATH)
+                if value_elements:
+                    result[key] = value_elements[0].text_content().strip()
+        return result
+
+    def parse_orders_table(self, html_content):
+        tree = self._parse(html_content)
+        rows = tree.xpath('//table//tbody//tr') if tree is not None else []
+        if not rows:
+            return None
+        orders = []
+        for row in rows:
+            elements = row.xpath(self._ROW_TRACKING_XPATH)
+            if elements:
+                orders.append((elements[0].get('title'), elements[0].get('href')))
+        return orders
+
+
+class SelectolaxParser:
+    """Разбор страниц через selectolax"""
+
+    name = 'selectolax'
+
+    def __init__(self):
+        if SelectolaxHTMLParser is None:
+            raise ImportError("Для SelectolaxParser требуется пакет selectolax")
+
+    def parse_search_response(self, html_content):
+        element = SelectolaxHTMLParser(html_content).css_first(f'.{TRACKING_CLASS} a')
+        if element is None:
+            return None
+        return _tracking_info(element.attributes.get('title'), element.attributes.get('href'), element.text())
+
+    def extract_weight_and_price(self, html_content):
+        result = {'weight': None, 'price_usd': None}
+        pending_key = None
+        # Абзацы в порядке документа: значение - первый p.fs14 после заголовка
+        for paragraph in SelectolaxHTMLParser(html_content).css('p'):
+            classes = (paragraph.attributes.get('class') or '').split()
+            if pending_key and 'fs14' in classes:
+                result[pending_key] = paragraph.text().strip()
+                pending_key = None
+            elif 'fs12' in classes and paragraph.child is not None and paragraph.child.tag == '-text' \
+                    and paragraph.child.next is None:
+                key = FIELD_TITLES.get(paragraph.text())
+                if key and result[key] is None:
+                    pending_key = key
+        return result
+
+    def parse_orders_table(self, html_content):
+        rows = SelectolaxHTMLParser(html_content).css('table tbody tr')
+        if not rows:
+            return None
+        orders = []
+        for row in rows:
+            element = row.css_first(f'.{TRACKING_CLASS} a')
+            if element is not None:
+                orders.append((element.attributes.get('title'), element.attributes.get('href')))
+        return orders
+
+
+class _StopParsing(Exception):
+    """Все нужные поля найдены, дальше страницу не разбираем"""
+
+
+class _SearchResponseExtractor(HTMLParser):
+    """Находит первую ссылку внутри .track-number__col--out"""
+
+    def __init__(self):
+        super().__init__()
+        self._container_depth = 0
+        self._in_link = False
+        self._text = []
+        self.result = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_ELEMENTS:
+            return
+        attrs = dict(attrs)
+        if self._container_depth:
+            self._container_depth += 1
+            if tag == 'a' and not self._in_link:
+                self._in_link = True
+                self.result = {'title': attrs.get('title'), 'href': attrs.get('href')}
+        elif TRACKING_CLASS in (attrs.get('class') or '').split():
+            self._container_depth = 1
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        if self._in_link and tag == 'a':
+            self.result['text'] = ''.join(self._text)
+            raise _StopParsing()
+        if self._container_depth:
+            self._container_depth -= 1
+
+    def handle_data(self, data):
+        if self._in_link:
+            self._text.append(data)
+
+
+class _PackageInfoExtractor(HTMLParser):
+    """Находит значения p.fs14, следующие за заголовками p.fs12"""
+
+    def __init__(self):
+        super().__init__()
+        self.result = {'weight': None, 'price_usd': None}
+        self._title = None  # Текст текущего p.fs12; None, если внутри есть теги
+        self._in_title = False
+        self._pending_key = None
+        self._value_depth = 0
+        self._value = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._value_depth:
+            if tag == 'p':
+                self._value_depth += 1
+            return
+        if self._in_title:
+            self._title = None  # Учитываем только заголовки без вложенных тегов
+        if tag != 'p':
+            return
+        classes = (dict(attrs).get('class') or '').split()
+        if self._pending_key and 'fs14' in classes:
+            self._value_depth = 1
+            self._value = []
+        elif 'fs12' in classes:
+            self._in_title = True
+            self._title = ''
+
+    def handle_endtag(self, tag):
+        if self._value_depth:
+            if tag == 'p':
+                self._value_depth -= 1
+                if not self._value_depth:
+                    self.result[self._pending_key] = ''.join(self._value).strip()
+                    self._pending_key = None
+                    if all(value is not None for value in self.result.values()):
+                        raise _StopParsing()
+            return
+        if self._in_title and tag == 'p':
+            self._in_title = False
+            key = FIELD_TITLES.get(self._title)
+            if key and self.result[key] is None:
+                self._pending_key = key
+
+    def handle_data(self, data):
+        if self._value_depth:
+            self._value.append(data)
+        elif self._in_title and self._title is not None:
+            self._title += data
+
+
+class _OrdersTableExtractor(HTMLParser):
+    """Собирает первую ссылку .track-number__col--out из каждой строки table tbody"""
+
+    def __init__(self):
+        super().__init__()
+        self._table_depth = 0
+        self._tbody_depth = 0
+        self._container_depth = 0
+        self._row_has_link = False
+        self.rows = 0
+        self.orders = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self._table_depth += 1
+        elif tag == 'tbody' and self._table_depth:
+            self._tbody_depth += 1
+        elif tag == 'tr' and self._tbody_depth:
+            self.rows += 1
+            self._row_has_link = False
+            self._container_depth = 0
+        if not self.rows or self._row_has_link or tag in VOID_ELEMENTS:
+            return
+        attrs = dict(attrs)
+        if self._container_depth:
+            self._container_depth += 1
+            if tag == 'a':
+                self._row_has_link = True
+                self.orders.append((attrs.get('title'), attrs.get('href')))
+        elif TRACKING_CLASS in (attrs.get('class') or '').split():
+            self._container_depth = 1
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        if self._container_depth:
+            self._container_depth -= 1
+        if tag == 'table' and self._table_depth:
+            self._table_depth -= 1
+        elif tag == 'tbody' and self._tbody_depth:
+            self._tbody_depth -= 1
+
+
+class StreamingParser:
+    """
+    Точечное извлечение полей потоковым html.parser из стандартной библиотеки.
+
+    Дерево документа не строится, а разбор прекращается, как только
+    найдены все нужные поля.
+    """
+
+    name = 'streaming'
+
+    def __init__(self, chunk_size=16384):
+        self._chunk_size = chunk_size
+
+    def _run(self, extractor, html_content):
+        try:
+            for start in range(0, len(html_content), self._chunk_size):
+                extractor.feed(html_content[start:start + self._chunk_size])
+            extractor.close()
+        except _StopParsing:
+            pass
+        return extractor
+
+    def parse_search_response(self, html_content):
+        result = self._run(_SearchResponseExtractor(), html_content).result
+        if result is None:
+            return None
+        return _tracking_info(result['title'], result['href'], result.get('text', ''))
+
+    def extract_weight_and_price(self, html_content):
+        return self._run(_PackageInfoExtractor(), html_content).result
+
+    def parse_orders_table(self, html_content):
+        extractor = self._run(_OrdersTableExtractor(), html_content)
+        if not extractor.rows:
+            return None
+        return extractor.orders
+
+
+PARSERS = {
+    SoupParser.name: SoupParser,
+    LxmlParser.name: LxmlParser,
+    SelectolaxParser.name: SelectolaxParser,
+    StreamingParser.name: StreamingParser,
+}
+
+
+def available_parsers():
+    """Имена бэкендов, зависимости которых установлены"""
+    names = []
+    for name, parser_class in PARSERS.items():
+        try:
+            parser_class()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_parser(name=None):
+    """
+    Создаёт парсер по имени
+
+    Args:
+        name: 'bs4', 'lxml', 'selectolax' или 'streaming'; по умолчанию
+            первый установленный из DEFAULT_PARSERS
+
+    Returns:
+        Экземпляр парсера
+    """
+    if name is None:
+        for default_name in DEFAULT_PARSERS:
+            try:
+                return PARSERS[default_name]()
+            except ImportError:
+                continue
+    if name not in PARSERS:
+        raise ValueError(f"Неизвестный парсер: {name}")
+    return PARSERS[name]()
+
+
+def _tracking_info(tracking_number, product_page_link, raw_tracking_number):
+    return {
+        'tracking_number': tracking_number,
+        'product_page_link': product_page_link,
+        'raw_tracking_number': raw_tracking_number.strip()
+    }
@@ -1,97 +1,175 @@
 # collect_tracking_info.py
 
+import argparse
 import requests
-from bs4 import BeautifulSoup
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 import time
-import re
+from html_parsers import get_parser
+from request_wrapper import RequestWrapper
+from order_store import OrderStore, extract_order_number_from_link
 from tracking_operations import login, get_package_info
 from config import USERNAME, PASSWORD  # Убедитесь, что у вас есть файл config.py с вашими данными
 
-def get_all_orders(session):
-    base_url = 'https://kz.globbing.com/ru/profile/my-orders/received'
+BASE_URL = 'https://kz.globbing.com/ru/profile/my-orders/received'
+PAGE_LIMIT = 100  # Можно увеличить при необходимости
+MAX_WORKERS = 4
+PARSER = get_parser()
+
+def fetch_orders_page(session, offset, limit=PAGE_LIMIT):
+    """
+    Загружает одну страницу полученных заказов
+
+    Returns:
+        list: Заказы со страницы или None, если строк в таблице больше нет
+    """
+    timestamp = int(time.time() * 1000)
+    url = f"{BASE_URL}?limit={limit}&offset={offset}&t={timestamp}"
+    headers = {
+        'Accept': '*/*',
+        'Referer': BASE_URL,
+        'X-Requested-With': 'XMLHttpRequest'
+    }
+    response = session.get(url, headers=headers)
+    response.raise_for_status()
+    html = response.text
+
+    # Поиск всех строк с заказами
+    rows = PARSER.parse_orders_table(html)
+    if rows is None:
+        return None
+
+    return [
+        {
+            'order_number': extract_order_number_from_link(product_page_link),
+            'tracking_number': tracking_number,
+            'product_page_link': product_page_link
+        }
+        for tracking_number, product_page_link in rows
+    ]
+
+def get_all_orders(session, max_workers=1):
+    """Загружает все страницы заказов, по max_workers страниц одновременно"""
+    orders = []
+    offset = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            offsets = [offset + i * PAGE_LIMIT for i in range(max_workers)]
+            pages = list(executor.map(lambda page_offset: fetch_orders_page(session, page_offset), offsets))
+            for page in pages:
+                if page is None:
+                    return orders  # Если заказов больше нет, выходим из цикла
+                orders.extend(page)
+            offset += PAGE_LIMIT * max_workers
+
+def get_new_orders(session, known_orders, high_water_mark=None):
+    """
+    Загружает страницы заказов до отметки прошлой синхронизации
+
+    Новые заказы находятся в начале списка, поэтому обход останавливается
+    на странице с отметкой. Страница, все заказы которой уже есть в базе,
+    обход не останавливает: после прерванной синхронизации в базе могут
+    быть только первые пачки новых заказов, а отметка остаётся прежней.
+    Без отметки загружаются все страницы.
+
+    Args:
+        session: Авторизованная сессия
+        known_orders: dict {order_number: (tracking_number, weight)} из базы
+        high_water_mark: Номер самого нового заказа прошлой синхронизации
+
+    Returns:
+        tuple: (orders, newest_order_number)
+            orders - новые и изменившиеся заказы
+            newest_order_number - номер самого нового заказа в списке или None
+    """
     orders = []
-    limit = 100  # Можно увеличить при необходимости
+    newest_order_number = None
     offset = 0
     while True:
-        timestamp = int(time.time() * 1000)
-        url = f"{base_url}?limit={limit}&offset={offset}&t={timestamp}"
-        headers = {
-            'Accept': '*/*',
-            'Referer': base_url,
-            'X-Requested-With': 'XMLHttpRequest'
-        }
-        response = session.get(url, headers=headers)
-        response.raise_for_status()
-        html = response.text
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # Поиск всех строк с заказами
-        rows = soup.select('table tbody tr')
-        if not rows:
-            break  # Если заказов больше нет, выходим из цикла
-
-        for row in rows:
-            tracking_number_element = row.select_one('.track-number__col--out a')
-            if tracking_number_element:
-                tracking_number = tracking_number_element.get('title')
-                product_page_link = tracking_number_element.get('href')
-                orders.append({
-                    'tracking_number': tracking_number,
-                    'product_page_link': product_page_link
-                })
-        offset += limit
-    return orders
-
-def extract_order_number_from_link(link):
-    match = re.search(r'/(\d+)$', link)
-    if match:
-        return match.group(1)
-    else:
-        return None
+        page = fetch_orders_page(session, offset)
+        if page is None:
+            break
 
-def main():
+        if newest_order_number is None and page:
+            newest_order_number = page[0]['order_number']
+
+        reached_high_water_mark = False
+        for order in page:
+            if order['order_number'] == high_water_mark:
+                reached_high_water_mark = True
+            if is_order_changed(order, known_orders.get(order['order_number'])):
+                orders.append(order)
+
+        if reached_high_water_mark:
+            break
+        offset += PAGE_LIMIT
+    return orders, newest_order_number
+
+def is_order_changed(order, known_order):
+    """Заказ нужно загрузить, если он новый, сменил трек-номер или ещё не взвешен"""
+    if known_order is None:
+        return True
+    known_tracking_number, known_weight = known_order
+    return known_tracking_number != order['tracking_number'] or known_weight is None
+
+def fetch_package_infos(session, orders, max_workers=MAX_WORKERS):
+    """
+    Загружает вес и стоимость для заказов в пуле из max_workers потоков
+
+    Yields:
+        dict: Заказ с добавленными weight и price_usd, в порядке заказов
+    """
+    def fetch(order):
+        weight, price_usd = get_package_info(session, order['product_page_link'])
+        return dict(order, weight=weight, price_usd=price_usd)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(fetch, orders)
+
+def main(full=False, max_workers=MAX_WORKERS):
     session = requests.Session()
     if not login(session, USERNAME, PASSWORD):
         print("Не удалось выполнить вход в систему")
         return
     print("Успешный вход в систему")
 
-    orders = get_all_orders(session)
-    print(f"Найдено {len(orders)} заказов")
+    # Запросы обхода идут через общий ограничитель частоты и автомат защиты сервера
+    client = RequestWrapper(session)
 
     # Настройка базы данных
-    conn = sqlite3.connect('orders.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS orders (
-            order_number TEXT PRIMARY KEY,
-            tracking_number TEXT,
-            weight TEXT,
-            price_usd TEXT
-        )
-    ''')
-
-    for order in orders:
-        tracking_number = order['tracking_number']
-        product_page_link = order['product_page_link']
-
-        # Получение веса и стоимости
-        weight, price_usd = get_package_info(session, product_page_link)
-
-        # Извлечение номера заказа из ссылки
-        order_number = extract_order_number_from_link(product_page_link)
-        if not order_number:
-            continue  # Пропускаем, если не удалось извлечь номер заказа
-
-        # Сохранение данных в базе данных
-        cursor.execute('''
-            INSERT OR REPLACE INTO orders (order_number, tracking_number, weight, price_usd)
-            VALUES (?, ?, ?, ?)
-        ''', (order_number, tracking_number, weight, price_usd))
-
-    conn.commit()
-    conn.close()
-    print("Данные успешно сохранены в базе данных")
-
-main()
+    store = OrderStore('orders.db')
+
+    if full:
+        orders = get_all_orders(client, max_workers)
+        newest_order_number = orders[0]['order_number'] if orders else None
+        print(f"Найдено {len(orders)} заказов")
+    else:
+        known_orders = store.load_known_orders()
+        high_water_mark = store.get_high_water_mark(USERNAME)
+        orders, newest_order_number = get_new_orders(client, known_orders, high_water_mark)
+        print(f"Найдено {len(orders)} новых или изменившихся заказов")
+
+        # Заказы, которые ещё не были взвешены, проверяем повторно
+        seen = {order['order_number'] for order in orders}
+        pending = [order for order in store.load_pending_orders() if order['order_number'] not in seen]
+        if pending:
+            print(f"Повторная проверка {len(pending)} заказов без веса")
+        orders.extend(pending)
+
+    # Извлечение номера заказа из ссылки, пропускаем, если не удалось
+    orders = [order for order in orders if order['order_number']]
+
+    # Получение веса и стоимости, сохранение пачками по мере загрузки
+    saved = store.save_orders(fetch_package_infos(client, orders, max_workers))
+
+    if newest_order_number:
+        store.set_high_water_mark(USERNAME, newest_order_number)
+
+    store.close()
+    print(f"Данные успешно сохранены в базе данных: {saved} заказов")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сбор информации о полученных заказах в orders.db")
+    parser.add_argument('--full', action='store_true', help="Полный обход всех страниц вместо инкрементальной синхронизации")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help="Число одновременных запросов")
+    args = parser.parse_args()
+    main(full=args.full, max_workers=args.workers)
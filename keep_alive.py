@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+
+MIN_INTERVAL = 60
+BASE_INTERVAL = 120
+MAX_INTERVAL = 30 * 60
+BACKOFF_FACTOR = 1.5
+
+
+class KeepAliveScheduler:
+    """
+    Поддержание сессии активной без лишних запросов.
+
+    Пинг отправляется только если за interval секунд не было ни одного
+    настоящего запроса. После каждого удачного пинга интервал растёт в
+    BACKOFF_FACTOR раз, но остаётся меньше половины простоя, после которого
+    сессия однажды уже истекла. Один поток живёт всё время работы объекта,
+    start и stop только включают и выключают пинги.
+    """
+
+    def __init__(self, ping_func, last_activity_func, min_interval=MIN_INTERVAL,
+                 base_interval=BASE_INTERVAL, max_interval=MAX_INTERVAL, backoff_factor=BACKOFF_FACTOR):
+        """
+        Args:
+            ping_func: Пинг сессии; возвращает True, если сессия была жива,
+                и False, если она истекла и потребовался повторный вход
+            last_activity_func: Время последнего запроса по time.monotonic или None
+        """
+        self._ping_func = ping_func
+        self._last_activity_func = last_activity_func
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff_factor = backoff_factor
+        self.interval = base_interval
+        self.last_ping_at = None
+        self.last_ping_ok = None
+        self.pings = 0
+        self.skipped = 0
+        self._expired_idle = None  # Наименьший простой, после которого сессия истекла
+        self._active = False
+        self._closed = False
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger(__name__)
+
+    def start(self):
+        """Включает пинги, запуская поток при первом вызове"""
+        with self._lock:
+            self._active = True
+            if self._thread is None or not self._thread.is_alive():
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name='keep-alive', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self):
+        """Выключает пинги; поток остаётся и ждёт следующего start"""
+        self._active = False
+        self._wake.set()
+
+    def close(self):
+        """Останавливает поток"""
+        self._active = False
+        self._closed = True
+        self._wake.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+
+    def _idle_seconds(self):
+        last_activity = self._last_activity_func()
+        if last_activity is None:
+            return float('inf')
+        return time.monotonic() - last_activity
+
+    def _next_delay(self):
+        """Через сколько секунд проверить, нужен ли пинг"""
+        if not self._active:
+            return None
+        return max(1.0, self.interval - self._idle_seconds())
+
+    def _run(self):
+        while True:
+            self._wake.wait(self._next_delay())
+            self._wake.clear()
+            if self._closed:
+                return
+            if not self._active:
+                continue
+            idle = self._idle_seconds()
+            if idle < self.interval:
+                self.skipped += 1  # Сессию уже поддерживают настоящие запросы
+                continue
+            self._ping(idle)
+
+    def _ping(self, idle):
+        self.last_ping_at = time.time()
+        self.pings += 1
+        try:
+            alive = self._ping_func()
+        except Exception as e:
+            self.last_ping_ok = False
+            self._logger.error(f"Keep-alive ping failed: {e}")
+            return
+        self.last_ping_ok = alive
+        if alive:
+            interval = min(self.interval * self._backoff_factor, self._max_interval)
+            if self._expired_idle is not None:
+                interval = min(interval, self._expired_idle / 2)
+        else:
+            # Сессия истекла за время простоя: пингуем вдвое чаще
+            if idle != float('inf'):
+                self._expired_idle = min(self._expired_idle or idle, idle)
+            interval = (self._expired_idle or self.interval) / 2
+        self.interval = max(self._min_interval, interval)
+        self._logger.info(f"Keep-alive ping {'ok' if alive else 'found expired session'}, "
+                          f"next in {self.interval:.0f} s")
+
+    def status(self):
+        """Состояние планировщика для логов и отладки"""
+        return {
+            'active': self._active,
+            'interval': self.interval,
+            'last_ping_at': self.last_ping_at,
+            'last_ping_ok': self.last_ping_ok,
+            'pings': self.pings,
+            'skipped': self.skipped
+        }
@@ -1,8 +1,94 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 
-def setup_logging(log_file='tracking_app.log'):
-    logging.basicConfig(
-        filename=log_file,
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
+LOG_FILE = 'tracking_app.log'
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 5
+
+_listener = None
+_queue_handler = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Запись лога одной строкой JSON для разбора отчётами.
+
+    QueueHandler добавляет трассировку исключения в текст сообщения ещё
+    в вызывающем потоке, поэтому она попадает в поле message.
+    """
+
+    def format(self, record):
+        entry = {
+            'ts': record.created,
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(log_file=LOG_FILE, json_format=False, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, when=None):
+    """
+    Настраивает запись логов в файл через очередь
+
+    Вызывающий поток (в том числе поток Tk) только кладёт запись в очередь,
+    в файл её пишет отдельный поток QueueListener.
+
+    Args:
+        log_file: Файл лога, всегда в UTF-8
+        json_format: Писать записи строками JSON вместо текста
+        max_bytes: Размер файла, после которого он ротируется
+        backup_count: Сколько старых файлов хранить
+        when: Ротация по времени вместо размера, например 'midnight'
+
+    Returns:
+        QueueListener: Запущенный обработчик очереди
+    """
+    global _listener, _queue_handler
+
+    # Повторный вызов заменяет прежнюю настройку, а не дублирует записи.
+    # Старый файл закрывается до открытия нового, чтобы ротации не пересеклись
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+    stop_logging()
+
+    if when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_file, when=when, backupCount=backup_count, encoding='utf-8'
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+    if json_format:
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    root.setLevel(logging.INFO)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    root.addHandler(_queue_handler)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Дописывает записи из очереди в файл и останавливает поток записи"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,100 @@
+import itertools
+import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+STAGE_WORKERS = (4, 4)  # Поиск, страница заказа
+POLL_INTERVAL_MS = 50
+
+
+class LookupWorker:
+    """
+    Конвейер фоновой обработки сканов с передачей результатов в поток Tk.
+
+    Каждый этап выполняется в своём пуле потоков, поэтому, пока одна
+    посылка ждёт страницу заказа, следующие уже проходят поиск.
+    Фоновые потоки не обращаются к виджетам: готовые задачи складываются
+    в очередь, которую главный поток разбирает через root.after.
+    """
+
+    def __init__(self, root, stage_workers=STAGE_WORKERS, poll_interval=POLL_INTERVAL_MS):
+        self.root = root
+        self._executors = [
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'lookup-{index}')
+            for index, workers in enumerate(stage_workers)
+        ]
+        self._results = queue.Queue()
+        self._poll_interval = poll_interval
+        self._callbacks = {}
+        self._job_ids = itertools.count(1)
+        self._closed = False
+        self.root.after(self._poll_interval, self._poll)
+
+    def submit(self, stages, value, on_done=None, on_error=None):
+        """
+        Запускает обработку value по цепочке этапов
+
+        Args:
+            stages: Функции этапов; этап i получает результат этапа i - 1
+                и выполняется в i-м пуле потоков
+            value: Входное значение первого этапа
+            on_done: Вызывается в потоке Tk с результатом последнего этапа
+                и временем обработки в секундах
+            on_error: Вызывается в потоке Tk с исключением
+
+        Returns:
+            int: Идентификатор задачи
+        """
+        job_id = next(self._job_ids)
+        self._callbacks[job_id] = (on_done, on_error, time.perf_counter())
+        self._run_stage(job_id, stages, 0, value)
+        return job_id
+
+    def _run_stage(self, job_id, stages, index, value):
+        executor = self._executors[min(index, len(self._executors) - 1)]
+
+        def on_stage_done(future):
+            if index == len(stages) - 1 or future.cancelled() or future.exception() is not None:
+                self._results.put((job_id, future, time.perf_counter()))
+            else:
+                self._run_stage(job_id, stages, index + 1, future.result())
+
+        try:
+            future = executor.submit(stages[index], value)
+        except RuntimeError:
+            return  # Пул уже остановлен при закрытии окна
+        future.add_done_callback(on_stage_done)
+
+    @property
+    def pending_count(self):
+        return len(self._callbacks)
+
+    def _poll(self):
+        """Передаёт готовые результаты обработчикам в потоке Tk"""
+        while True:
+            try:
+                job_id, future, finished_at = self._results.get_nowait()
+            except queue.Empty:
+                break
+            on_done, on_error, started_at = self._callbacks.pop(job_id, (None, None, None))
+            try:
+                error = future.exception()
+                if error is None:
+                    if on_done:
+                        on_done(future.result(), finished_at - started_at)
+                elif on_error:
+                    on_error(error)
+                else:
+                    logging.error(f"Lookup job {job_id} failed: {error}")
+            except Exception as e:
+                logging.error(f"Error handling lookup job {job_id}: {e}")
+
+        if not self._closed:
+            self.root.after(self._poll_interval, self._poll)
+
+    def shutdown(self):
+        """Останавливает разбор очереди и отменяет задачи, которые ещё не начались"""
+        self._closed = True
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,244 @@
+import re
+import sqlite3
+import threading
+import time
+from tracking_info import finder
+
+DEFAULT_DB_PATH = 'orders.db'
+BATCH_SIZE = 500
+
+_NUMBER_RE = re.compile(r'\d+(?:[.,]\d+)?')
+
+
+def extract_order_number_from_link(link):
+    match = re.search(r'/(\d+)$', link or '')
+    if match:
+        return match.group(1)
+    else:
+        return None
+
+
+def format_weight(value):
+    """Вес из базы в формате страницы заказа, например 1,5 кг"""
+    return f"{value:g} кг".replace(".", ",") if value is not None else None
+
+
+def format_price(value):
+    """Стоимость из базы в формате страницы заказа, например 11.00 $"""
+    return f"{value:.2f} $" if value is not None else None
+
+
+def parse_number(value):
+    """
+    Извлекает первое число из строки вида "1,5 кг" или "11.00 $"
+
+    Returns:
+        float: Число или None, если его нет в строке
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER_RE.search(value)
+    if not match:
+        return None
+    return float(match.group(0).replace(",", "."))
+
+
+class OrderStore:
+    """
+    Хранилище заказов в SQLite.
+
+    База работает в режиме WAL, поэтому GUI и отчёты читают её во время
+    обхода заказов. Запись выполняется пачками через executemany, каждая
+    пачка фиксируется отдельно.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=BATCH_SIZE, normalizer=finder):
+        self._path = path
+        self._batch_size = batch_size
+        self._normalizer = normalizer
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._setup()
+
+    def _setup(self):
+        """Создаёт таблицы и индексы, переносит данные из старой схемы"""
+        with self._lock:
+            columns = [row[1] for row in self._conn.execute('PRAGMA table_info(orders)')]
+            if columns and 'normalized_tracking_number' not in columns:
+                self._conn.execute('ALTER TABLE orders RENAME TO orders_legacy')
+                self._conn.commit()
+            # Таблица могла остаться после прерванного переноса
+            legacy_columns = [row[1] for row in self._conn.execute('PRAGMA table_info(orders_legacy)')]
+
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS orders (
+                    order_number TEXT PRIMARY KEY,
+                    tracking_number TEXT,
+                    normalized_tracking_number TEXT,
+                    weight REAL,
+                    price_usd REAL,
+                    product_page_link TEXT,
+                    updated_at REAL
+                )
+            ''')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_orders_tracking_number ON orders (tracking_number)'
+            )
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_orders_normalized_tracking_number '
+                'ON orders (normalized_tracking_number)'
+            )
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    account TEXT PRIMARY KEY,
+                    high_water_mark TEXT,
+                    synced_at REAL
+                )
+            ''')
+            self._conn.commit()
+
+        if legacy_columns:
+            self._migrate_legacy(legacy_columns)
+
+    def _migrate_legacy(self, columns):
+        """Переносит заказы с текстовыми весом и стоимостью в новую таблицу"""
+        link_column = 'product_page_link' if 'product_page_link' in columns else 'NULL'
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT order_number, tracking_number, weight, price_usd, {link_column} FROM orders_legacy'
+            ).fetchall()
+        self.save_orders(
+            {
+                'order_number': order_number,
+                'tracking_number': tracking_number,
+                'weight': weight,
+                'price_usd': price_usd,
+                'product_page_link': product_page_link
+            }
+            for order_number, tracking_number, weight, price_usd, product_page_link in rows
+        )
+        with self._lock:
+            self._conn.execute('DROP TABLE orders_legacy')
+            self._conn.commit()
+
+    def _normalize(self, tracking_number):
+        """Трек-номер после обработки finder или None"""
+        if not tracking_number:
+            return None
+        try:
+            return self._normalizer(tracking_number)
+        except Exception:
+            return None
+
+    def _to_row(self, order, updated_at):
+        return (
+            order['order_number'],
+            order['tracking_number'],
+            self._normalize(order['tracking_number']),
+            parse_number(order.get('weight')),
+            parse_number(order.get('price_usd')),
+            order.get('product_page_link'),
+            updated_at
+        )
+
+    def _write_batch(self, rows):
+        with self._lock:
+            self._conn.executemany('''
+                INSERT OR REPLACE INTO orders (
+                    order_number, tracking_number, normalized_tracking_number,
+                    weight, price_usd, product_page_link, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            self._conn.commit()
+
+    def save_orders(self, orders):
+        """
+        Сохраняет заказы пачками по batch_size
+
+        Args:
+            orders: Итерируемый набор словарей с ключами order_number,
+                tracking_number, weight, price_usd и product_page_link.
+                Вес и стоимость могут быть строками ("1 кг", "11.00 $")
+
+        Returns:
+            int: Количество сохранённых заказов
+        """
+        saved = 0
+        batch = []
+        for order in orders:
+            batch.append(self._to_row(order, time.time()))
+            if len(batch) >= self._batch_size:
+                self._write_batch(batch)
+                saved += len(batch)
+                batch = []
+        if batch:
+            self._write_batch(batch)
+            saved += len(batch)
+        return saved
+
+    def load_known_orders(self):
+        """Возвращает {order_number: (tracking_number, weight)} для сохранённых заказов"""
+        with self._lock:
+            cursor = self._conn.execute('SELECT order_number, tracking_number, weight FROM orders')
+            return {order_number: (tracking_number, weight) for order_number, tracking_number, weight in cursor}
+
+    def load_pending_orders(self):
+        """Сохранённые заказы без веса, страницу которых нужно проверить повторно"""
+        with self._lock:
+            cursor = self._conn.execute('''
+                SELECT order_number, tracking_number, product_page_link FROM orders
+                WHERE weight IS NULL AND product_page_link IS NOT NULL
+            ''')
+            return [
+                {'order_number': order_number, 'tracking_number': tracking_number, 'product_page_link': product_page_link}
+                for order_number, tracking_number, product_page_link in cursor
+            ]
+
+    def find_by_tracking_number(self, tracking_number):
+        """
+        Ищет заказ по точному или нормализованному трек-номеру
+
+        Returns:
+            dict: Сохранённый заказ или None
+        """
+        order = self._fetch_order('tracking_number', tracking_number)
+        if order is None:
+            normalized = self._normalize(tracking_number)
+            if normalized:
+                order = self._fetch_order('normalized_tracking_number', normalized)
+        return order
+
+    def _fetch_order(self, column, value):
+        """Самый свежий заказ с заданным значением индексированной колонки"""
+        with self._lock:
+            cursor = self._conn.execute(
+                f'SELECT * FROM orders WHERE {column} = ? ORDER BY updated_at DESC LIMIT 1', (value,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([description[0] for description in cursor.description], row))
+
+    def get_high_water_mark(self, account):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT high_water_mark FROM sync_state WHERE account = ?', (account,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_high_water_mark(self, account, order_number):
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO sync_state (account, high_water_mark, synced_at)
+                VALUES (?, ?, ?)
+            ''', (account, order_number, time.time()))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,3 +1,9 @@
+import re
+
+# Число в начале строки: "11.00 $", "11.00$", "10,5 USD"
+_LEADING_NUMBER_RE = re.compile(r'\s*([\d.,]+)')
+
+
 class PriceService:
     def __init__(self, exchange_rate):
         self.exchange_rate = exchange_rate
@@ -17,13 +23,16 @@ class PriceService:
             if not usd_price_str:
                 return 0.0, 0.0
                 
-            # Извлекаем числовое значение из строки
-            usd_value = float(usd_price_str[:-2].replace(",", "."))
+            # Извлекаем числовое значение из начала строки, пробел перед валютой необязателен
+            match = _LEADING_NUMBER_RE.match(usd_price_str)
+            if not match:
+                return 0.0, 0.0
+            usd_value = float(match.group(1).replace(",", "."))
             rub_value = usd_value * self.exchange_rate
             
             return usd_value, rub_value
             
-        except (ValueError, IndexError):
+        except ValueError:
             return 0.0, 0.0
 
     def format_price(self, usd_price_str):
@@ -0,0 +1,70 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов.
+
+    В корзине помещается capacity токенов, они восполняются со скоростью
+    rate в секунду. Каждый запрос забирает токен; если корзина пуста,
+    вызывающий поток ждёт. Один объект разделяют все потоки.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self):
+        """
+        Забирает токен без ожидания
+
+        Returns:
+            float: 0, если токен получен, иначе сколько секунд ждать до следующего
+        """
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.acquired += 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        """
+        Ждёт токен
+
+        Args:
+            timeout: Максимальное ожидание в секундах или None без ограничения
+
+        Returns:
+            bool: True, если токен получен
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        started = self._clock()
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                self.waited_seconds += self._clock() - started
+                return True
+            if deadline is not None and self._clock() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def stats(self):
+        return {
+            'rate': self.rate,
+            'capacity': self.capacity,
+            'acquired': self.acquired,
+            'waited_seconds': self.waited_seconds
+        }
@@ -0,0 +1,87 @@
+import threading
+import time
+from concurrent.futures import Future
+
+RECENT_WINDOW = 2.0  # Секунды, в течение которых готовый результат отдаётся повторным вызовам
+
+
+class RequestCoalescer:
+    """
+    Объединение одинаковых запросов.
+
+    Пока запрос с ключом key выполняется, остальные вызовы с тем же ключом
+    ждут его результата вместо отправки своего. Готовый результат ещё
+    window секунд отдаётся без запроса (двойное нажатие Enter, одинаковые
+    номера в пакете). Ошибки передаются всем ожидающим, но не запоминаются.
+    """
+
+    def __init__(self, window=RECENT_WINDOW, clock=time.monotonic):
+        self._window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._recent = {}
+        self.calls = 0
+        self.executed = 0
+        self.joined = 0
+        self.recent_hits = 0
+
+    def run(self, key, func, *args):
+        """
+        Выполняет func(*args) или возвращает результат такого же запроса
+
+        Returns:
+            Результат func; одинаковым вызовам возвращается один и тот же объект
+        """
+        with self._lock:
+            self.calls += 1
+            now = self._clock()
+            recent = self._recent.get(key)
+            if recent is not None:
+                completed_at, result = recent
+                if now - completed_at < self._window:
+                    self.recent_hits += 1
+                    return result
+                del self._recent[key]
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                self.executed += 1
+            else:
+                self.joined += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = func(*args)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            self._recent[key] = (self._clock(), result)
+            self._prune(self._clock())
+        future.set_result(result)
+        return result
+
+    def _prune(self, now):
+        """Удаляет результаты старше window"""
+        expired = [key for key, (completed_at, _) in self._recent.items() if now - completed_at >= self._window]
+        for key in expired:
+            del self._recent[key]
+
+    def stats(self):
+        """Сколько запросов сэкономлено объединением"""
+        return {
+            'calls': self.calls,
+            'executed': self.executed,
+            'joined': self.joined,
+            'recent_hits': self.recent_hits,
+            'saved': self.joined + self.recent_hits
+        }
@@ -1,28 +1,184 @@
 import requests
+import re
+import threading
 import time
 import logging
-from typing import Optional, Dict, Any
-from requests.exceptions import RequestException
+from collections import deque
+from typing import Optional, Dict, Any, Callable
+from urllib.parse import urlparse
+from requests.exceptions import RequestException, HTTPError
+from retry_policy import RetryPolicy
+from rate_limiter import TokenBucket
+from circuit_breaker import CircuitBreaker
+from tracing import span
+
+LOGIN_PATH_RE = re.compile(r'/login/?$')
+AUTH_FAILURE_STATUS_CODES = (401, 419)  # 419 - истёкший CSRF-токен Laravel
+ATTEMPT_LOG_SIZE = 1000
+RATE_LIMIT = 5  # Запросов в секунду к одному серверу
+RATE_BURST = 10
+
+_host_guards = {}
+_host_guards_lock = threading.Lock()
+
+
+def get_host_guards(host: str):
+    """
+    Общие для всех RequestWrapper процесса ограничитель частоты и автомат защиты сервера
+
+    Returns:
+        tuple: (TokenBucket, CircuitBreaker) для host
+    """
+    with _host_guards_lock:
+        if host not in _host_guards:
+            _host_guards[host] = (TokenBucket(RATE_LIMIT, RATE_BURST), CircuitBreaker())
+        return _host_guards[host]
+
+
+def host_guard_stats() -> Dict[str, Any]:
+    """Состояние ограничителей и автоматов защиты по серверам"""
+    with _host_guards_lock:
+        guards = dict(_host_guards)
+    return {
+        host: {'rate_limiter': limiter.stats(), 'circuit_breaker': breaker.stats()}
+        for host, (limiter, breaker) in guards.items()
+    }
+
+
+class SessionExpiredError(RequestException):
+    """Сессия истекла, и повторная авторизация не помогла"""
+
 
 class RequestWrapper:
-    def __init__(self, session: Optional[requests.Session] = None, max_retries: int = 3, retry_delay: int = 1):
+    def __init__(self, session: Optional[requests.Session] = None, max_retries: int = 3, retry_delay: int = 1,
+                 auth_handler: Optional[Callable[[], bool]] = None, retry_policy: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[TokenBucket] = None, circuit_breaker: Optional[CircuitBreaker] = None):
         self._session = session or requests.Session()
-        self._max_retries = max_retries
-        self._retry_delay = retry_delay
+        # Если не заданы явно, используются общие для сервера объекты из get_host_guards
+        self._rate_limiter = rate_limiter
+        self._circuit_breaker = circuit_breaker
+        self._retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries, base_delay=retry_delay)
+        # Последние попытки запросов: метод, url, номер попытки, статус, ошибка, время и пауза
+        self.attempts = deque(maxlen=ATTEMPT_LOG_SIZE)
+        self._auth_handler = auth_handler
+        # Повторный вход выполняет один поток, остальные ждут его на блокировке
+        self._auth_lock = threading.Lock()
+        self._auth_generation = 0
+        self._auth_local = threading.local()
+        self.last_request_at = None  # time.monotonic() последнего ответа сервера
         self._logger = logging.getLogger(__name__)
 
-    def _make_request(self, method: str, url: str, **kwargs) -> requests.Response:
-        """Выполняет HTTP запрос с повторными попытками при ошибках"""
-        for attempt in range(self._max_retries):
+    def _is_auth_failure(self, url: str, response: requests.Response) -> bool:
+        """Проверяет, что сервер вместо ответа отправил на страницу входа или отказал в доступе"""
+        if LOGIN_PATH_RE.search(urlparse(url).path):
+            return False  # Запросы самой страницы входа
+        if response.status_code in AUTH_FAILURE_STATUS_CODES:
+            return True
+        redirects = [r.headers.get('Location', '') for r in response.history + [response]] + [response.url]
+        return any(LOGIN_PATH_RE.search(urlparse(location).path) for location in redirects)
+
+    def _reauthenticate(self, generation: int):
+        """
+        Выполняет повторный вход, если его ещё не выполнил другой поток
+
+        Args:
+            generation: Номер входа, с которым был отправлен неудачный запрос
+        """
+        with self._auth_lock:
+            if self._auth_generation != generation:
+                return  # Другой поток уже выполнил вход, просто повторяем запрос
+            self._logger.warning("Session expired, logging in again")
+            self._auth_local.active = True
             try:
-                response = getattr(self._session, method.lower())(url, **kwargs)
-                response.raise_for_status()
+                success = self._auth_handler()
+            except Exception as e:
+                self._logger.error(f"Re-login failed: {e}")
+                success = False
+            finally:
+                self._auth_local.active = False
+            self._auth_generation += 1
+        if not success:
+            raise SessionExpiredError("Session expired and re-login failed")
+
+    def _send_with_retries(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Выполняет HTTP запрос с повторными попытками по правилам retry_policy"""
+        policy = self._retry_policy
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            # Разомкнутая цепь прерывает и повторы: CircuitOpenError выбрасывается до запроса
+            rate_limiter, circuit_breaker = self._guards(url)
+            circuit_breaker.before_call()
+            rate_limiter.acquire()
+            attempt_started = time.monotonic()
+            response = None
+            try:
+                with span('http.attempt', method=method, attempt=attempt) as attempt_span:
+                    response = getattr(self._session, method.lower())(url, **kwargs)
+                    attempt_span.set(status_code=response.status_code)
+                self.last_request_at = time.monotonic()
+                if not (self._auth_handler and self._is_auth_failure(url, response)):
+                    response.raise_for_status()
+                circuit_breaker.record_success()
+                self._record_attempt(method, url, attempt, attempt_started, response.status_code)
                 return response
-            except RequestException as e:
-                self._logger.error(f"Attempt {attempt + 1}/{self._max_retries} failed: {str(e)}")
-                if attempt == self._max_retries - 1:
+            except (HTTPError, requests.ConnectionError, requests.Timeout) as e:
+                status_code = response.status_code if response is not None else None
+                if status_code is None or status_code in policy.status_codes:
+                    circuit_breaker.record_failure()
+                else:
+                    circuit_breaker.record_success()  # Сервер отвечает, ошибка в самом запросе
+                delay = policy.next_delay(
+                    method, attempt, time.monotonic() - started, status_code,
+                    response.headers if response is not None else None
+                )
+                self._record_attempt(method, url, attempt, attempt_started, status_code, e, delay)
+                self._logger.error(f"Attempt {attempt}/{policy.max_attempts} failed: {str(e)}")
+                if delay is None:
                     raise
-                time.sleep(self._retry_delay)
+                time.sleep(delay)
+            except RequestException as e:
+                # Ошибки в самом запросе (неверный URL и т.п.) не повторяем
+                self._record_attempt(method, url, attempt, attempt_started, None, e)
+                self._logger.error(f"Request failed: {str(e)}")
+                raise
+
+    def _guards(self, url: str):
+        """Ограничитель частоты и автомат защиты для сервера из url"""
+        if self._rate_limiter and self._circuit_breaker:
+            return self._rate_limiter, self._circuit_breaker
+        shared_limiter, shared_breaker = get_host_guards(urlparse(url).netloc)
+        return self._rate_limiter or shared_limiter, self._circuit_breaker or shared_breaker
+
+    def _record_attempt(self, method, url, attempt, started, status_code, error=None, delay=None):
+        self.attempts.append({
+            'method': method,
+            'url': url,
+            'attempt': attempt,
+            'status_code': status_code,
+            'error': type(error).__name__ if error else None,
+            'elapsed': time.monotonic() - started,
+            'retry_delay': delay
+        })
+
+    def _make_request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Выполняет HTTP запрос; если сессия истекла, выполняет вход и повторяет запрос
+
+        Raises:
+            SessionExpiredError: Если после повторного входа сервер снова отправил на страницу входа
+        """
+        generation = self._auth_generation
+        response = self._send_with_retries(method, url, **kwargs)
+        if not self._auth_handler or getattr(self._auth_local, 'active', False):
+            return response
+        if self._is_auth_failure(url, response):
+            self._reauthenticate(generation)
+            response = self._send_with_retries(method, url, **kwargs)
+            if self._is_auth_failure(url, response):
+                raise SessionExpiredError(f"Session expired for url: {url}")
+        return response
 
     def get(self, url: str, **kwargs) -> requests.Response:
         """Выполняет GET запрос"""
@@ -32,6 +188,15 @@ class RequestWrapper:
         """Выполняет POST запрос"""
         return self._make_request('POST', url, **kwargs)
 
+    def head(self, url: str, **kwargs) -> requests.Response:
+        """Выполняет HEAD запрос"""
+        return self._make_request('HEAD', url, **kwargs)
+
+    @property
+    def auth_generation(self) -> int:
+        """Количество выполненных повторных входов"""
+        return self._auth_generation
+
     def get_session(self) -> requests.Session:
         """Возвращает текущую сессию"""
         return self._session
@@ -39,3 +204,7 @@ class RequestWrapper:
     def set_session(self, session: requests.Session):
         """Устанавливает новую сессию"""
         self._session = session
+
+    def set_auth_handler(self, auth_handler: Optional[Callable[[], bool]]):
+        """Устанавливает функцию повторного входа, которая возвращает True при успехе"""
+        self._auth_handler = auth_handler
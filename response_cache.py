@@ -0,0 +1,147 @@
+import logging
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = 'http_cache.db'
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+CACHE_TTL = 60 * 60  # Свежесть ответов без ETag и Last-Modified
+
+
+class ResponseCache:
+    """
+    Кэш HTTP ответов на диске, ключ - URL.
+
+    Если сервер прислал ETag или Last-Modified, повторный запрос отправляется
+    с If-None-Match/If-Modified-Since, и при ответе 304 тело берётся из кэша.
+    Ответы без валидаторов считаются свежими ttl секунд. Когда суммарный
+    размер тел превышает max_bytes, удаляются давно не использованные записи.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=MAX_CACHE_BYTES, ttl=CACHE_TTL):
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER,
+                stored_at REAL,
+                used_at REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_used_at ON responses (used_at)')
+        self._conn.commit()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self._logger = logging.getLogger(__name__)
+
+    def _lookup(self, url):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT body, etag, last_modified, size, stored_at FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+
+    def _touch(self, url, revalidated):
+        now = time.time()
+        with self._lock:
+            if revalidated:
+                self._conn.execute('UPDATE responses SET stored_at = ?, used_at = ? WHERE url = ?', (now, now, url))
+            else:
+                self._conn.execute('UPDATE responses SET used_at = ? WHERE url = ?', (now, url))
+            self._conn.commit()
+
+    def _store(self, url, response):
+        body = response.text
+        size = len(body.encode('utf-8'))
+        if size > self._max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO responses (url, body, etag, last_modified, size, stored_at, used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'), size, now, now))
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Удаляет давно не использованные записи, пока кэш больше max_bytes"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        for url, size in self._conn.execute('SELECT url, size FROM responses ORDER BY used_at').fetchall():
+            self._conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self.evictions += 1
+            total -= size
+            if total <= self._max_bytes:
+                break
+
+    def fetch(self, request_wrapper, url, headers=None, **kwargs):
+        """
+        Возвращает тело ответа из кэша или с сервера
+
+        Args:
+            request_wrapper: RequestWrapper для запросов
+            url: Адрес страницы
+            headers: Заголовки запроса
+
+        Returns:
+            str: Тело ответа
+        """
+        entry = self._lookup(url)
+        headers = dict(headers or {})
+        if entry:
+            body, etag, last_modified, size, stored_at = entry
+            if not etag and not last_modified and time.time() - stored_at < self._ttl:
+                self.hits += 1
+                self.bytes_saved += size
+                self._touch(url, revalidated=False)
+                return body
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        response = request_wrapper.get(url, headers=headers, **kwargs)
+        response.raise_for_status()
+        if entry and response.status_code == 304:
+            self.revalidated += 1
+            self.bytes_saved += entry[3]
+            self._touch(url, revalidated=True)
+            return entry[0]
+
+        self.misses += 1
+        self._store(url, response)
+        return response.text
+
+    def invalidate(self, url):
+        """Удаляет запись, например если страница ещё не содержит нужных данных"""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'bytes_saved': self.bytes_saved,
+            'entries': entries,
+            'size': size
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,88 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+TRANSIENT_STATUS_CODES = frozenset((408, 429, 500, 502, 503, 504))
+
+
+def parse_retry_after(value, now=None):
+    """
+    Разбирает заголовок Retry-After
+
+    Args:
+        value: Число секунд или HTTP-дата
+        now: Текущее время (time.time()), для тестов
+
+    Returns:
+        float: Пауза в секундах или None, если значение не разобрано
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, retry_at - now)
+
+
+class RetryPolicy:
+    """
+    Правила повторных попыток HTTP запросов.
+
+    Повторяются только идемпотентные методы и только при ошибках соединения
+    или временных статусах (429, 5xx). Пауза растёт экспоненциально от
+    base_delay со случайной добавкой, чтобы клиенты не повторяли запросы
+    одновременно; Retry-After сервера имеет приоритет. Все попытки одного
+    вызова укладываются в total_budget секунд.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=10, total_budget=30,
+                 methods=IDEMPOTENT_METHODS, status_codes=TRANSIENT_STATUS_CODES,
+                 respect_retry_after=True, rng=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.total_budget = total_budget
+        self.methods = frozenset(method.upper() for method in methods)
+        self.status_codes = frozenset(status_codes)
+        self.respect_retry_after = respect_retry_after
+        self._rng = rng or random.Random()
+
+    def backoff(self, attempt):
+        """Пауза после попытки attempt (с 1): половина фиксирована, половина случайна"""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay / 2 + self._rng.uniform(0, delay / 2)
+
+    def next_delay(self, method, attempt, elapsed, status_code=None, headers=None):
+        """
+        Решает, повторять ли запрос после неудачной попытки
+
+        Args:
+            method: HTTP метод
+            attempt: Номер неудачной попытки, начиная с 1
+            elapsed: Сколько секунд прошло с начала первой попытки
+            status_code: Статус ответа или None при ошибке соединения
+            headers: Заголовки ответа (для Retry-After)
+
+        Returns:
+            float: Пауза перед следующей попыткой или None, если повторять не нужно
+        """
+        if attempt >= self.max_attempts or method.upper() not in self.methods:
+            return None
+        if status_code is not None and status_code not in self.status_codes:
+            return None
+
+        delay = None
+        if self.respect_retry_after and headers:
+            delay = parse_retry_after(headers.get('Retry-After'))
+        if delay is None:
+            delay = self.backoff(attempt)
+
+        if elapsed + delay > self.total_budget:
+            return None
+        return delay
@@ -0,0 +1,46 @@
+import math
+import time
+from collections import deque
+
+LATENCY_WINDOW = 500
+RATE_WINDOW = 60
+
+
+class ScanStats:
+    """Пропускная способность и задержки обработки сканов"""
+
+    def __init__(self, latency_window=LATENCY_WINDOW, rate_window=RATE_WINDOW):
+        self._latencies = deque(maxlen=latency_window)
+        self._completed_at = deque()
+        self._rate_window = rate_window
+
+    def record(self, latency, completed_at=None):
+        """
+        Учитывает завершённый скан
+
+        Args:
+            latency: Время обработки в секундах
+            completed_at: Время завершения по time.monotonic()
+        """
+        self._latencies.append(latency)
+        self._completed_at.append(time.monotonic() if completed_at is None else completed_at)
+
+    def scans_per_minute(self, now=None):
+        """Число сканов, завершённых за последние rate_window секунд, в пересчёте на минуту"""
+        now = time.monotonic() if now is None else now
+        while self._completed_at and now - self._completed_at[0] > self._rate_window:
+            self._completed_at.popleft()
+        return len(self._completed_at) * 60 / self._rate_window
+
+    def percentile(self, percent):
+        """
+        Перцентиль времени обработки по последним latency_window сканам
+
+        Returns:
+            float: Время в секундах или None, если сканов ещё не было
+        """
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        index = max(0, min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1))
+        return ordered[index]
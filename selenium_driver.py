@@ -1,8 +1,106 @@
+import json
+import logging
+import os
+import time
+
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
+DRIVER_CACHE_PATH = 'chromedriver_cache.json'
+DRIVER_CACHE_TTL = 7 * 24 * 60 * 60  # Как часто сверяться с сервером chromedriver
+
+logger = logging.getLogger(__name__)
+
+
+def get_chrome_version():
+    """
+    Версия установленного Chrome без обращения к сети
+
+    Returns:
+        str: Версия, например 132.0.6834, или None, если её не удалось определить
+    """
+    try:
+        # webdriver-manager 4.x
+        from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
+        return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.warning(f"Failed to detect Chrome version: {e}")
+        return None
+    try:
+        # webdriver-manager 3.x
+        from webdriver_manager.core.utils import get_browser_version_from_os, ChromeType
+        return get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception as e:
+        logger.warning(f"Failed to detect Chrome version: {e}")
+        return None
+
+
+def _load_driver_cache(cache_path):
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to read chromedriver cache: {e}")
+        return None
+
+
+def _save_driver_cache(cache_path, driver_path, chrome_version):
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'driver_path': driver_path,
+                'chrome_version': chrome_version,
+                'resolved_at': time.time()
+            }, f)
+    except OSError as e:
+        logger.warning(f"Failed to save chromedriver cache: {e}")
+
+
+def resolve_driver_path(cache_path=DRIVER_CACHE_PATH, ttl=DRIVER_CACHE_TTL):
+    """
+    Путь к chromedriver с локальным кэшем
+
+    Пока не истёк ttl, файл драйвера на месте и версия Chrome не изменилась,
+    путь берётся из кэша без запросов к серверу. Если сеть недоступна,
+    используется закэшированный драйвер, даже если ttl истёк.
+
+    Returns:
+        str: Путь к исполняемому файлу chromedriver
+    """
+    started = time.perf_counter()
+    chrome_version = get_chrome_version()
+    logger.info(f"Chrome version {chrome_version} detected in {time.perf_counter() - started:.3f} s")
+
+    cache = _load_driver_cache(cache_path)
+    cached_path = cache.get('driver_path') if cache else None
+    cached_path_exists = bool(cached_path) and os.path.exists(cached_path)
+    if (
+        cached_path_exists
+        and time.time() - cache.get('resolved_at', 0) < ttl
+        and (chrome_version is None or cache.get('chrome_version') == chrome_version)
+    ):
+        logger.info(f"Chromedriver {cached_path} taken from cache in {time.perf_counter() - started:.3f} s")
+        return cached_path
+
+    install_started = time.perf_counter()
+    try:
+        driver_path = ChromeDriverManager().install()
+    except Exception as e:
+        if not cached_path_exists:
+            raise
+        logger.warning(f"Chromedriver check failed ({e}), using cached {cached_path}")
+        return cached_path
+    logger.info(f"Chromedriver {driver_path} resolved online in {time.perf_counter() - install_started:.3f} s")
+    _save_driver_cache(cache_path, driver_path, chrome_version)
+    return driver_path
+
+
 def create_driver(headless=True):
     # Настройки Chrome
     chrome_options = Options()
@@ -15,7 +113,7 @@ def create_driver(headless=True):
         chrome_options.add_argument("--disable-notifications")  # Отключение уведомлений
         chrome_options.add_argument("--disable-extensions")  # Отключение расширений
 
-    # Автоматическое управление драйвером
-    service = Service(ChromeDriverManager().install())
+    # Путь к драйверу из локального кэша, сервер проверяется раз в DRIVER_CACHE_TTL
+    service = Service(resolve_driver_path())
     driver = webdriver.Chrome(service=service, options=chrome_options)
     return driver
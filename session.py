@@ -1,106 +1,206 @@
 from bs4 import BeautifulSoup
+import logging
 import time
-import traceback
-import threading
 import requests
 from request_wrapper import RequestWrapper
 from selenium_driver import create_driver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from session_cache import SessionCache
+from keep_alive import KeepAliveScheduler
+from tracing import span
+
+PROFILE_URL = "https://kz.globbing.com/ru/profile/my-orders"
+PROBE_TIMEOUT = 10
+RECAPTCHA_TIMEOUT = 20  # Верхняя граница ожидания токена, секунды
+RECAPTCHA_POLL_INTERVAL = 0.25
 
 class GlobbingSession:
-    def __init__(self, username, password):
+    def __init__(self, username, password, session_cache=None,
+                 recaptcha_timeout=RECAPTCHA_TIMEOUT, recaptcha_poll_interval=RECAPTCHA_POLL_INTERVAL):
         self._username = username
         self._password = password
-        self.request_wrapper = RequestWrapper()
+        # Истёкшая сессия обнаруживается в RequestWrapper, который вызывает refresh
+        self.request_wrapper = RequestWrapper(auth_handler=self.refresh)
         self._session = self.request_wrapper.get_session()
+        self._session_cache = session_cache or SessionCache()
+        self._recaptcha_timeout = recaptcha_timeout
+        self._recaptcha_poll_interval = recaptcha_poll_interval
+        self.last_recaptcha_seconds = None
         self._selenium_driver = None
         self._is_logged_in = False
-        self._keep_alive_thread = None
-        self._stop_keep_alive = threading.Event()
+        self._ping_method = 'HEAD'
+        # Диагностика входа идёт в лог: stdout batch.py занят результатами
+        self._logger = logging.getLogger(__name__)
+        self._keep_alive = KeepAliveScheduler(self._ping, lambda: self.request_wrapper.last_request_at)
+
+    def _ping(self):
+        """
+        Лёгкий запрос для поддержания сессии: HEAD без перехода по редиректам
 
-    def _keep_alive(self):
-        """Фоновый поток для поддержания сессии активной"""
-        while not self._stop_keep_alive.is_set():
+        Returns:
+            bool: True, если сессия была жива, False, если потребовался повторный вход
+        """
+        generation = self.request_wrapper.auth_generation
+        if self._ping_method == 'HEAD':
             try:
-                if self._is_logged_in:
-                    # Делаем запрос к профилю пользователя для поддержания сессии
-                    self.request_wrapper.get("https://kz.globbing.com/ru/profile/my-orders")
-            except Exception as e:
-                print(f"Ошибка в keep_alive: {e}")
-            time.sleep(120)  # Ждем 2 минуты
+                self.request_wrapper.head(PROFILE_URL, allow_redirects=False)
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code != 405:
+                    raise
+                self._ping_method = 'GET'  # Сервер не поддерживает HEAD
+        if self._ping_method == 'GET':
+            self.request_wrapper.get(PROFILE_URL, allow_redirects=False, stream=True).close()
+        # Сервер обновляет cookies в ответах, сохраняем свежие
+        self.save_session()
+        return self.request_wrapper.auth_generation == generation
 
     def start_keep_alive(self):
-        """Запускает фоновый поток для поддержания сессии"""
-        if not self._keep_alive_thread or not self._keep_alive_thread.is_alive():
-            self._stop_keep_alive.clear()
-            self._keep_alive_thread = threading.Thread(target=self._keep_alive, daemon=True)
-            self._keep_alive_thread.start()
+        """Включает пинги для поддержания сессии"""
+        self._keep_alive.start()
 
     def stop_keep_alive(self):
-        """Останавливает фоновый поток"""
-        if self._keep_alive_thread and self._keep_alive_thread.is_alive():
-            self._stop_keep_alive.set()
-            self._keep_alive_thread.join(timeout=1)
-        
+        """Выключает пинги"""
+        self._keep_alive.stop()
+
+    def keep_alive_status(self):
+        """Когда был последний пинг и удался ли он"""
+        return self._keep_alive.status()
+
+    def save_session(self):
+        """Сохраняет cookies авторизованной сессии на диск"""
+        if self._is_logged_in:
+            self._session_cache.save(self._session)
+
+    def _probe_session(self):
+        """Проверяет, что текущие cookies дают доступ к профилю; как и пинг, без тела страницы"""
+        try:
+            response = self._session.head(PROFILE_URL, allow_redirects=False, timeout=PROBE_TIMEOUT)
+            if response.status_code == 405:
+                self._ping_method = 'GET'  # Сервер не поддерживает HEAD
+                with self._session.get(PROFILE_URL, allow_redirects=False, timeout=PROBE_TIMEOUT,
+                                       stream=True) as response:
+                    return response.status_code == 200
+            return response.status_code == 200
+        except requests.RequestException as e:
+            self._logger.warning(f"Ошибка проверки сохранённой сессии: {e}")
+            return False
+
+    def _restore_session(self):
+        """
+        Восстанавливает сессию из сохранённых cookies без запуска Selenium
+
+        Returns:
+            bool: True, если сохранённая сессия ещё действительна
+        """
+        if not self._session_cache.restore(self._session):
+            return False
+        if not self._probe_session():
+            self._logger.info("Сохранённая сессия недействительна, выполняем вход")
+            self._session.cookies.clear()
+            self._session_cache.clear()
+            return False
+        self._is_logged_in = True
+        self.start_keep_alive()
+        return True
+
     def refresh(self):
         """Выполняет повторную авторизацию"""
         self.stop_keep_alive()
+        self._is_logged_in = False
+        self._session_cache.clear()
         new_session = requests.Session()
         self._session = new_session
         self.request_wrapper.set_session(new_session)
-        if self._selenium_driver:
-            self._selenium_driver.quit()
-        self._selenium_driver = None
+        # Драйвер Selenium не закрываем: повторный вход использует уже запущенный Chrome
         success = self._login()
         if success:
             self.start_keep_alive()
         return success
         
-    def _get_recaptcha_token(self, login_url):
-        """Получает reCAPTCHA токен через Selenium"""
-        try:
-            # Закрываем предыдущую сессию Selenium, если она существует
-            if self._selenium_driver:
-                self._selenium_driver.quit()
-                self._selenium_driver = None
-                
-            # Создаем новую сессию
+    def _get_driver(self):
+        """Возвращает запущенный драйвер Selenium, создавая его при первом вызове"""
+        if self._selenium_driver is None:
             self._selenium_driver = create_driver()
-            self._selenium_driver.get(login_url)
-            time.sleep(20)  # Ждем загрузку страницы и reCAPTCHA
-            recaptcha_input = self._selenium_driver.find_element(By.ID, 'g-recaptcha-response')
-            token = recaptcha_input.get_attribute('value')
-            
-            # Закрываем сессию после получения токена
-            self._selenium_driver.quit()
-            self._selenium_driver = None
-            
-            return token
-        except Exception as e:
-            print(f'Ошибка получения reCAPTCHA токена: {e}')
-            traceback.print_exc()
-            if self._selenium_driver:
+        return self._selenium_driver
+
+    def _quit_driver(self):
+        """Закрывает драйвер Selenium"""
+        if self._selenium_driver:
+            try:
                 self._selenium_driver.quit()
-                self._selenium_driver = None
-            return None
+            except WebDriverException:
+                pass
+            self._selenium_driver = None
+
+    def _read_recaptcha_token(self, driver):
+        """Значение g-recaptcha-response или False, пока токен не готов"""
+        elements = driver.find_elements(By.ID, 'g-recaptcha-response')
+        if not elements:
+            return False
+        return elements[0].get_attribute('value') or False
+
+    def _get_recaptcha_token(self, login_url):
+        """
+        Получает reCAPTCHA токен через Selenium
+
+        Ждёт, пока поле g-recaptcha-response заполнится, но не дольше
+        recaptcha_timeout секунд. Драйвер остаётся запущенным для следующего входа.
+        """
+        for attempt in range(2):
+            try:
+                driver = self._get_driver()
+                # Чистый браузер: старые cookies могут перенаправить со страницы входа
+                driver.delete_all_cookies()
+                started = time.perf_counter()
+                driver.get(login_url)
+                token = WebDriverWait(
+                    driver, self._recaptcha_timeout, poll_frequency=self._recaptcha_poll_interval
+                ).until(self._read_recaptcha_token)
+                self.last_recaptcha_seconds = time.perf_counter() - started
+                self._logger.info(f"reCAPTCHA токен получен за {self.last_recaptcha_seconds:.1f} с")
+                return token
+            except TimeoutException:
+                self._logger.error(f"reCAPTCHA токен не получен за {self._recaptcha_timeout} с")
+                return None
+            except WebDriverException as e:
+                # Драйвер мог упасть между входами: пересоздаём его один раз
+                self._logger.error(f'Ошибка получения reCAPTCHA токена: {e}', exc_info=attempt == 1)
+                self._quit_driver()
+            except Exception as e:
+                self._logger.exception(f'Ошибка получения reCAPTCHA токена: {e}')
+                self._quit_driver()
+                return None
+        return None
         
     def _login(self):
-        """Выполняет авторизацию с использованием Selenium для reCAPTCHA"""
+        """
+        Выполняет авторизацию: сначала пробует сохранённые cookies,
+        и только если они не подошли, получает reCAPTCHA через Selenium
+        """
+        with span('login.restore_session') as restore_span:
+            restored = self._restore_session()
+            restore_span.set(restored=restored)
+        if restored:
+            return True
         try:
             login_url = "https://kz.globbing.com/ru/login/"
             
             # Получаем reCAPTCHA токен
-            recaptcha_value = self._get_recaptcha_token(login_url)
+            with span('login.recaptcha'):
+                recaptcha_value = self._get_recaptcha_token(login_url)
             if not recaptcha_value:
-                print("Не удалось получить reCAPTCHA токен")
+                self._logger.error("Не удалось получить reCAPTCHA токен")
                 return False
 
             # Получаем _token со страницы логина
-            response = self.request_wrapper.get(login_url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            token_input = soup.find('input', {'name': '_token'})
+            with span('login.csrf_token'):
+                response = self.request_wrapper.get(login_url)
+                soup = BeautifulSoup(response.text, 'html.parser')
+                token_input = soup.find('input', {'name': '_token'})
             if not token_input:
-                print("Не удалось получить _token")
+                self._logger.error("Не удалось получить _token")
                 return False
             token = token_input.get('value')
 
@@ -119,37 +219,39 @@ class GlobbingSession:
             }
 
             # Выполняем авторизацию
-            login_response = self.request_wrapper.post(login_url, data=data, headers=headers)
+            with span('login.post'):
+                login_response = self.request_wrapper.post(login_url, data=data, headers=headers)
 
             # Проверяем ответ
             try:
                 json_data = login_response.json()
                 if 'data' in json_data and json_data['data'].get('message') == 'globbing.login.success':
                     redirect_url = json_data['data'].get('redirect_url', 'https://kz.globbing.com/ru')
-                    self.request_wrapper.get(redirect_url)
+                    with span('login.redirect'):
+                        self.request_wrapper.get(redirect_url)
                     self._is_logged_in = True
+                    self.save_session()
                     self.start_keep_alive()
                     return True
                 else:
-                    print("Ошибка авторизации:", json_data)
+                    self._logger.error(f"Ошибка авторизации: {json_data}")
                     return False
             except ValueError:
                 # Если ответ не JSON, проверяем редирект
                 if login_response.url != login_url:
                     self._is_logged_in = True
+                    self.save_session()
                     self.start_keep_alive()
                     return True
                 else:
-                    print("Ошибка авторизации, нет JSON ответа")
+                    self._logger.error("Ошибка авторизации, нет JSON ответа")
                     return False
 
         except Exception as e:
-            print(f"Ошибка при авторизации: {e}")
-            traceback.print_exc()
+            self._logger.exception(f"Ошибка при авторизации: {e}")
             return False
             
     def __del__(self):
         """Закрываем Selenium драйвер и останавливаем фоновый поток при уничтожении объекта"""
-        self.stop_keep_alive()
-        if self._selenium_driver:
-            self._selenium_driver.quit()
+        self._keep_alive.close()
+        self._quit_driver()
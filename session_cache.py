@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+import time
+
+import requests
+
+DEFAULT_CACHE_PATH = 'session_cache.json'
+SESSION_COOKIE_MAX_AGE = 12 * 60 * 60  # Для cookies без срока действия
+
+
+class SessionCache:
+    """
+    Cookies авторизованной сессии на диске.
+
+    Вместе с каждой cookie сохраняется срок действия; cookies без срока
+    (сессионные) считаются действительными SESSION_COOKIE_MAX_AGE секунд
+    с момента сохранения. Файл пишется атомарно и доступен только владельцу.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, session_cookie_max_age=SESSION_COOKIE_MAX_AGE):
+        self._path = path
+        self._session_cookie_max_age = session_cookie_max_age
+        self._logger = logging.getLogger(__name__)
+
+    def save(self, session: requests.Session):
+        """Сохраняет cookies сессии"""
+        saved_at = time.time()
+        cookies = [
+            {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'secure': cookie.secure,
+                'expires': cookie.expires if cookie.expires is not None
+                else saved_at + self._session_cookie_max_age
+            }
+            for cookie in session.cookies
+        ]
+        temp_path = f"{self._path}.tmp"
+        try:
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'saved_at': saved_at, 'cookies': cookies}, f)
+            os.replace(temp_path, self._path)
+        except OSError as e:
+            self._logger.error(f"Failed to save session cache: {e}")
+
+    def load(self, now=None):
+        """
+        Читает сохранённые cookies
+
+        Returns:
+            list: Непросроченные cookies или пустой список,
+                если файла нет, он повреждён или все cookies истекли
+        """
+        now = time.time() if now is None else now
+        try:
+            with open(self._path, encoding='utf-8') as f:
+                data = json.load(f)
+            return [cookie for cookie in data['cookies'] if cookie['expires'] > now]
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self._logger.error(f"Failed to read session cache: {e}")
+            return []
+
+    def restore(self, session: requests.Session):
+        """
+        Загружает сохранённые cookies в сессию
+
+        Returns:
+            bool: True, если хотя бы одна cookie была восстановлена
+        """
+        cookies = self.load()
+        for cookie in cookies:
+            session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie['domain'],
+                path=cookie['path'],
+                secure=cookie['secure'],
+                expires=int(cookie['expires'])
+            )
+        return bool(cookies)
+
+    def clear(self):
+        """Удаляет файл с cookies"""
+        try:
+            os.remove(self._path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self._logger.error(f"Failed to remove session cache: {e}")
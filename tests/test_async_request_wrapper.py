@@ -0,0 +1,236 @@
+import asyncio
+from urllib.parse import urlparse
+
+import aiohttp
+import pytest
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from async_request_wrapper import AsyncRequestWrapper
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from rate_limiter import TokenBucket
+from request_wrapper import RequestWrapper, get_host_guards
+from retry_policy import RetryPolicy
+
+
+class StubSite:
+    """Заглушка сайта на aiohttp.web, которая считает запросы и соединения"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.peers = set()
+        self.counts = {}
+        app = web.Application()
+        app.router.add_get('/slow', self.slow)
+        app.router.add_get('/flaky', self.flaky)
+        app.router.add_post('/flaky', self.flaky)
+        app.router.add_get('/missing', self.missing)
+        app.router.add_get('/cookie', self.cookie)
+        self.server = TestServer(app)
+
+    def _count(self, request):
+        self.counts[request.path] = self.counts.get(request.path, 0) + 1
+        self.peers.add(request.transport.get_extra_info('peername'))
+
+    async def slow(self, request):
+        self._count(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        return web.Response(text='ok')
+
+    async def flaky(self, request):
+        self._count(request)
+        if self.failures > 0:
+            self.failures -= 1
+            return web.Response(status=503, headers={'Retry-After': '0'})
+        return web.Response(text='ok')
+
+    async def missing(self, request):
+        self._count(request)
+        return web.Response(status=404)
+
+    async def cookie(self, request):
+        self._count(request)
+        return web.Response(text=request.cookies.get('sid', ''))
+
+    def url(self, path):
+        return str(self.server.make_url(path))
+
+
+def run_with_site(scenario, failures=0, **wrapper_kwargs):
+    """Запускает scenario(site, wrapper) с заглушкой сайта и закрывает обе стороны"""
+    async def main():
+        site = StubSite(failures)
+        await site.server.start_server()
+        wrapper_kwargs.setdefault('retry_policy', RetryPolicy(max_attempts=3, base_delay=0.01))
+        try:
+            async with AsyncRequestWrapper(**wrapper_kwargs) as wrapper:
+                await scenario(site, wrapper)
+        finally:
+            await site.server.close()
+        return site
+
+    return asyncio.run(main())
+
+
+def test_limit_per_host_caps_concurrent_requests():
+    async def scenario(site, wrapper):
+        responses = await asyncio.gather(*(wrapper.get(site.url('/slow')) for _ in range(10)))
+        assert [response.text for response in responses] == ['ok'] * 10
+
+    site = run_with_site(scenario, limit_per_host=3)
+    assert site.counts['/slow'] == 10
+    assert site.max_in_flight == 3
+
+
+def test_sequential_requests_reuse_connection():
+    async def scenario(site, wrapper):
+        for _ in range(5):
+            await wrapper.get(site.url('/slow'))
+
+    site = run_with_site(scenario)
+    assert len(site.peers) == 1
+
+
+def test_transient_status_is_retried():
+    async def scenario(site, wrapper):
+        response = await wrapper.get(site.url('/flaky'))
+        assert response.status_code == 200
+        assert response.text == 'ok'
+
+    site = run_with_site(scenario, failures=2)
+    assert site.counts['/flaky'] == 3
+
+
+def test_retries_stop_after_max_attempts():
+    async def scenario(site, wrapper):
+        with pytest.raises(requests.HTTPError) as error:
+            await wrapper.get(site.url('/flaky'))
+        assert error.value.response.status_code == 503
+
+    site = run_with_site(scenario, failures=5)
+    assert site.counts['/flaky'] == 3
+
+
+def test_client_error_is_not_retried():
+    async def scenario(site, wrapper):
+        with pytest.raises(requests.HTTPError):
+            await wrapper.get(site.url('/missing'))
+
+    site = run_with_site(scenario)
+    assert site.counts['/missing'] == 1
+
+
+def test_post_is_not_retried():
+    async def scenario(site, wrapper):
+        with pytest.raises(requests.HTTPError):
+            await wrapper.post(site.url('/flaky'))
+
+    site = run_with_site(scenario, failures=1)
+    assert site.counts['/flaky'] == 1
+
+
+def test_requests_use_shared_host_guards():
+    hosts = []
+
+    async def scenario(site, wrapper):
+        hosts.append(urlparse(site.url('/slow')).netloc)
+        await wrapper.get(site.url('/slow'))
+        await wrapper.get(site.url('/slow'))
+
+    run_with_site(scenario)
+    rate_limiter, circuit_breaker = get_host_guards(hosts[0])
+    assert rate_limiter.acquired == 2
+    assert circuit_breaker.state == 'closed'
+
+
+def test_rate_limiter_spaces_requests():
+    rate_limiter = TokenBucket(rate=20, capacity=1)
+
+    async def scenario(site, wrapper):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.gather(*(wrapper.get(site.url('/flaky')) for _ in range(3)))
+        # Первый токен есть сразу, два следующих восполняются по 0.05 с
+        assert loop.time() - started >= 0.09
+
+    run_with_site(scenario, rate_limiter=rate_limiter, circuit_breaker=CircuitBreaker())
+    assert rate_limiter.acquired == 3
+
+
+def test_open_circuit_stops_retries():
+    circuit_breaker = CircuitBreaker(failure_threshold=2)
+
+    async def scenario(site, wrapper):
+        with pytest.raises(CircuitOpenError):
+            await wrapper.get(site.url('/flaky'))
+        with pytest.raises(CircuitOpenError):
+            await wrapper.get(site.url('/flaky'))
+
+    site = run_with_site(scenario, failures=5, rate_limiter=TokenBucket(1000), circuit_breaker=circuit_breaker)
+    assert site.counts['/flaky'] == 2
+
+
+def test_client_error_does_not_open_circuit():
+    circuit_breaker = CircuitBreaker(failure_threshold=1)
+
+    async def scenario(site, wrapper):
+        for _ in range(2):
+            with pytest.raises(requests.HTTPError):
+                await wrapper.get(site.url('/missing'))
+
+    site = run_with_site(scenario, rate_limiter=TokenBucket(1000), circuit_breaker=circuit_breaker)
+    assert site.counts['/missing'] == 2
+    assert circuit_breaker.state == 'closed'
+
+
+class FakeGlobbingSession:
+    """GlobbingSession, у которой refresh заменяет requests.Session, как настоящая"""
+
+    def __init__(self):
+        self.request_wrapper = RequestWrapper(self._make_session('first'))
+
+    @staticmethod
+    def _make_session(sid):
+        session = requests.Session()
+        session.cookies.set('sid', sid)
+        return session
+
+    def refresh(self):
+        self.request_wrapper.set_session(self._make_session('second'))
+        return True
+
+
+def test_globbing_session_cookies_follow_refresh():
+    globbing_session = FakeGlobbingSession()
+
+    async def scenario(site, wrapper):
+        assert (await wrapper.get(site.url('/cookie'))).text == 'first'
+        globbing_session.refresh()
+        assert (await wrapper.get(site.url('/cookie'))).text == 'second'
+
+    async def main():
+        site = StubSite()
+        await site.server.start_server()
+        try:
+            async with AsyncRequestWrapper.from_globbing_session(globbing_session) as wrapper:
+                await scenario(site, wrapper)
+        finally:
+            await site.server.close()
+
+    asyncio.run(main())
+
+
+def test_connection_error_is_raised_after_retries():
+    async def scenario(site, wrapper):
+        url = site.url('/slow')
+        await site.server.close()
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await wrapper.get(url)
+
+    run_with_site(scenario)
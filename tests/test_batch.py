@@ -0,0 +1,80 @@
+import json
+import sys
+import types
+
+import pytest
+import requests
+
+pytest.importorskip('selenium')
+
+from benchmarks.bench_load import LocalSiteAdapter
+from benchmarks.fake_globbing import FakeGlobbing, SITE_URL
+from circuit_breaker import CircuitBreaker
+from rate_limiter import TokenBucket
+from request_wrapper import RequestWrapper
+from session_cache import SessionCache
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    # config.py с учётными данными не хранится в репозитории
+    config = types.ModuleType('config')
+    config.USERNAME, config.PASSWORD, config.EXCHANGE_RATE = 'test@example.com', 'secret', 90.0
+    monkeypatch.setitem(sys.modules, 'config', config)
+    monkeypatch.delitem(sys.modules, 'batch', raising=False)
+    import batch
+    import logger
+    yield batch
+    logger.stop_logging()
+    if logger._queue_handler is not None:
+        logger.logging.getLogger().removeHandler(logger._queue_handler)
+
+
+@pytest.fixture
+def fake():
+    with FakeGlobbing(orders=20, latency=0) as server:
+        yield server
+
+
+def make_session_factory(session_class, fake):
+    """GlobbingSession, запросы которой идут на FakeGlobbing, а reCAPTCHA не требует Chrome"""
+    def make_session(username, password):
+        session = session_class(username, password)
+        http_session = session.request_wrapper.get_session()
+        http_session.mount(SITE_URL, LocalSiteAdapter(fake.base_url, 4))
+        session.request_wrapper = RequestWrapper(
+            http_session, auth_handler=session.refresh,
+            rate_limiter=TokenBucket(1e9, 1e9), circuit_breaker=CircuitBreaker()
+        )
+
+        def noisy_recaptcha(login_url):
+            print("stray output from the login flow")
+            return 'fake-recaptcha'
+
+        session._get_recaptcha_token = noisy_recaptcha
+        return session
+
+    return make_session
+
+
+def test_stdout_contains_only_result_records(batch, fake, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    # Недействительная сохранённая сессия: вход проходит через проверку cookies и полный вход
+    stale = requests.Session()
+    stale.cookies.set('stale', 'value', domain='kz.globbing.com', path='/')
+    SessionCache().save(stale)
+
+    numbers = [order['tracking_number'] for order in fake.orders[:5]] + ['garbage']
+    (tmp_path / 'numbers.txt').write_text('\n'.join(numbers) + '\n', encoding='utf-8')
+    monkeypatch.setattr(batch, 'GlobbingSession', make_session_factory(batch.GlobbingSession, fake))
+    monkeypatch.setattr(sys, 'argv', ['batch.py', 'numbers.txt', '--format', 'jsonl', '--workers', '2'])
+
+    batch.main()
+
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+    assert sorted(record['input'] for record in records) == sorted(numbers)
+    assert all(set(record) == set(batch.FIELDS) for record in records)
+    assert sum(record['status'] == 'found' for record in records) == 5
+    assert "stray output from the login flow" in captured.err
+    assert "Обработано 6 номеров" in captured.err
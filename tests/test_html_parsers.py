@@ -0,0 +1,70 @@
+import os
+import re
+
+import pytest
+
+from html_parsers import PARSERS, available_parsers
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+BACKENDS = [name for name in available_parsers() if name != 'bs4']
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def remove_cell(html, title):
+    """Убирает со страницы заказа ячейку с заголовком title"""
+    return re.sub(
+        rf'<div class="order-view__cell"><p class="fs12">{title}</p>.*?</p></div>\n', '', html, flags=re.S
+    )
+
+
+def empty_table(html):
+    return re.sub(r'<tbody>.*</tbody>', '<tbody>\n        </tbody>', html, flags=re.S)
+
+
+PRODUCT_PAGE = load_fixture('product_page.html')
+SEARCH_RESULT = load_fixture('search_result.html')
+ORDERS_PAGE = load_fixture('orders_page.html')
+
+CASES = {
+    'search_result': ('parse_search_response', SEARCH_RESULT),
+    'search_no_rows': ('parse_search_response', empty_table(SEARCH_RESULT)),
+    'product_page': ('extract_weight_and_price', PRODUCT_PAGE),
+    'product_missing_weight': ('extract_weight_and_price', remove_cell(PRODUCT_PAGE, 'Вес')),
+    'product_no_price': ('extract_weight_and_price', remove_cell(PRODUCT_PAGE, 'Стоимость доставки')),
+    'product_comma_price': ('extract_weight_and_price', PRODUCT_PAGE.replace('11.00 $', '11,00 $')),
+    'product_dot_weight': ('extract_weight_and_price', PRODUCT_PAGE.replace('1,5 кг', '1.5 кг')),
+    'orders_page': ('parse_orders_table', ORDERS_PAGE),
+    'orders_no_rows': ('parse_orders_table', empty_table(ORDERS_PAGE)),
+}
+
+
+def test_baseline_values():
+    """Эталон bs4 на исходных страницах, чтобы совпадение бэкендов что-то значило"""
+    reference = PARSERS['bs4']()
+    assert reference.extract_weight_and_price(PRODUCT_PAGE) == {'weight': '1,5 кг', 'price_usd': '11.00 $'}
+    assert reference.parse_search_response(SEARCH_RESULT)['product_page_link'] == \
+        'https://kz.globbing.com/ru/sale-order/view/4471093'
+    assert len(reference.parse_orders_table(ORDERS_PAGE)) == 100
+
+
+def test_edge_case_baseline():
+    reference = PARSERS['bs4']()
+    assert reference.extract_weight_and_price(CASES['product_missing_weight'][1]) == \
+        {'weight': None, 'price_usd': '11.00 $'}
+    assert reference.extract_weight_and_price(CASES['product_no_price'][1]) == \
+        {'weight': '1,5 кг', 'price_usd': None}
+    assert reference.extract_weight_and_price(CASES['product_comma_price'][1])['price_usd'] == '11,00 $'
+    assert reference.parse_search_response(CASES['search_no_rows'][1]) is None
+    assert reference.parse_orders_table(CASES['orders_no_rows'][1]) is None
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('case', CASES)
+def test_backend_matches_bs4(backend, case):
+    method, html = CASES[case]
+    expected = getattr(PARSERS['bs4'](), method)(html)
+    assert getattr(PARSERS[backend](), method)(html) == expected
@@ -0,0 +1,51 @@
+import pytest
+
+from cost_calculator import CostCalculator
+from price_service import PriceService
+
+EXCHANGE_RATE = 90
+
+
+@pytest.mark.parametrize('price, usd', [
+    ('11.00 $', 11.0),
+    ('11.00$', 11.0),
+    ('10,5 USD', 10.5),
+    ('10.5USD', 10.5),
+    ('  7 $', 7.0),
+])
+def test_convert_to_rub_parses_leading_number(price, usd):
+    assert PriceService(EXCHANGE_RATE).convert_to_rub(price) == (usd, usd * EXCHANGE_RATE)
+
+
+@pytest.mark.parametrize('price', [None, '', '$', 'н/д', '1.2.3 $'])
+def test_convert_to_rub_returns_zero_for_invalid_price(price):
+    assert PriceService(EXCHANGE_RATE).convert_to_rub(price) == (0.0, 0.0)
+
+
+def test_format_price():
+    assert PriceService(EXCHANGE_RATE).format_price('11.00$') == ('Price: 11.00$ USD (990.00 руб.)', 990.0)
+    assert PriceService(EXCHANGE_RATE).format_price(None) == ('Price not available', 0.0)
+
+
+def test_bulk_pricing_matches_price_service():
+    bulk_pricing = pytest.importorskip('bulk_pricing')
+    prices = ['11.00 $', '11.00$', '10,5 USD', '7 $']
+    usd, rub, errors = bulk_pricing.convert_to_rub(prices, EXCHANGE_RATE)
+    service = PriceService(EXCHANGE_RATE)
+    assert not errors.any()
+    assert [(float(u), float(r)) for u, r in zip(usd, rub)] == [service.convert_to_rub(price) for price in prices]
+
+
+def test_bulk_pricing_matches_cost_calculator():
+    bulk_pricing = pytest.importorskip('bulk_pricing')
+    weights = ['1,5 кг', '1,5кг', '2 kg', '0.25кг', '10']
+    calculator = CostCalculator()
+    costs, errors = bulk_pricing.calculate_costs(weights, calculator.weight_cost_modifier)
+    assert not errors.any()
+    assert [float(cost) for cost in costs] == [calculator.calculate_cost(weight) for weight in weights]
+
+
+@pytest.mark.parametrize('weight', ['', 'кг', 'н/д', '1.2.3 кг'])
+def test_calculate_cost_rejects_invalid_weight(weight):
+    with pytest.raises(ValueError, match="Неверный формат веса"):
+        CostCalculator().calculate_cost(weight)
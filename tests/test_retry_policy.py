@@ -0,0 +1,186 @@
+import random
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import request_wrapper
+from circuit_breaker import CircuitBreaker
+from rate_limiter import TokenBucket
+from request_wrapper import RequestWrapper
+from retry_policy import RetryPolicy, parse_retry_after
+
+
+class UpperBoundRng:
+    """Случайная добавка всегда максимальна: пауза равна полной экспоненте"""
+
+    def uniform(self, low, high):
+        return high
+
+
+class FakeClock:
+    """Замена модуля time в request_wrapper: sleep только сдвигает часы"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedServer:
+    """Локальный сервер, который отвечает статусами из списка по очереди, затем 200"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.methods = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self):
+                server.methods.append(self.command)
+                status, headers = server.responses.pop(0) if server.responses else (200, {})
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            do_GET = do_POST = _reply
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}/ru/profile/my-orders/received'
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(request_wrapper, 'time', fake_clock)
+    return fake_clock
+
+
+def make_wrapper(policy):
+    return RequestWrapper(
+        retry_policy=policy, rate_limiter=TokenBucket(1e9, 1e9), circuit_breaker=CircuitBreaker()
+    )
+
+
+def test_backoff_doubles_up_to_max_delay():
+    policy = RetryPolicy(base_delay=0.5, max_delay=3, rng=UpperBoundRng())
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+
+def test_backoff_jitter_stays_in_upper_half():
+    policy = RetryPolicy(base_delay=1, max_delay=100, rng=random.Random(1))
+    for attempt in range(1, 6):
+        full = 2 ** (attempt - 1)
+        for _ in range(50):
+            assert full / 2 <= policy.backoff(attempt) <= full
+
+
+@pytest.mark.parametrize('status_code', [None, 408, 429, 500, 502, 503, 504])
+def test_transient_failures_are_retried(status_code):
+    policy = RetryPolicy(base_delay=0.5, rng=UpperBoundRng())
+    assert policy.next_delay('GET', 1, 0, status_code) == 0.5
+
+
+@pytest.mark.parametrize('status_code', [400, 401, 403, 404, 501])
+def test_client_errors_are_not_retried(status_code):
+    assert RetryPolicy().next_delay('GET', 1, 0, status_code) is None
+
+
+@pytest.mark.parametrize('method', ['POST', 'PATCH', 'post'])
+def test_non_idempotent_methods_are_not_retried(method):
+    assert RetryPolicy().next_delay(method, 1, 0, 503) is None
+
+
+def test_attempts_are_limited():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.next_delay('GET', 2, 0, 503) is not None
+    assert policy.next_delay('GET', 3, 0, 503) is None
+
+
+def test_retry_after_overrides_backoff():
+    policy = RetryPolicy(base_delay=0.5, rng=UpperBoundRng())
+    assert policy.next_delay('GET', 1, 0, 429, {'Retry-After': '7'}) == 7.0
+    assert RetryPolicy(respect_retry_after=False, base_delay=0.5, rng=UpperBoundRng()).next_delay(
+        'GET', 1, 0, 429, {'Retry-After': '7'}
+    ) == 0.5
+
+
+def test_total_budget_stops_retries():
+    policy = RetryPolicy(base_delay=1, total_budget=10, rng=UpperBoundRng())
+    assert policy.next_delay('GET', 1, 8.5, 503) == 1
+    assert policy.next_delay('GET', 1, 9.5, 503) is None
+    assert policy.next_delay('GET', 1, 0, 503, {'Retry-After': '60'}) is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(formatdate(1030, usegmt=True), now=1000) == 30.0
+    assert parse_retry_after(formatdate(900, usegmt=True), now=1000) == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+
+def test_wrapper_retries_503_and_429_then_succeeds(clock):
+    server = ScriptedServer([(503, {'Retry-After': '2'}), (429, {})])
+    try:
+        wrapper = make_wrapper(RetryPolicy(max_attempts=3, base_delay=0.5, rng=UpperBoundRng()))
+        response = wrapper.get(server.url)
+    finally:
+        server.close()
+
+    assert response.status_code == 200
+    assert server.methods == ['GET', 'GET', 'GET']
+    # Первая пауза из Retry-After, вторая - экспонента для второй попытки
+    assert clock.sleeps == [2.0, 1.0]
+    attempts = list(wrapper.attempts)
+    assert [(a['attempt'], a['status_code'], a['retry_delay']) for a in attempts] == [
+        (1, 503, 2.0), (2, 429, 1.0), (3, 200, None)
+    ]
+    assert [a['error'] for a in attempts] == ['HTTPError', 'HTTPError', None]
+
+
+def test_wrapper_gives_up_after_max_attempts(clock):
+    server = ScriptedServer([(503, {})] * 5)
+    try:
+        wrapper = make_wrapper(RetryPolicy(max_attempts=3, base_delay=0.5, rng=UpperBoundRng()))
+        with pytest.raises(requests.HTTPError):
+            wrapper.get(server.url)
+    finally:
+        server.close()
+
+    assert len(server.methods) == 3
+    assert clock.sleeps == [0.5, 1.0]
+    assert wrapper.attempts[-1]['retry_delay'] is None
+
+
+def test_wrapper_does_not_retry_post(clock):
+    server = ScriptedServer([(503, {})])
+    try:
+        wrapper = make_wrapper(RetryPolicy(max_attempts=3, base_delay=0.5))
+        with pytest.raises(requests.HTTPError):
+            wrapper.post(server.url, data={'a': 1})
+    finally:
+        server.close()
+
+    assert server.methods == ['POST']
+    assert clock.sleeps == []
+    assert len(wrapper.attempts) == 1
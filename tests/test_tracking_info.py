@@ -0,0 +1,22 @@
+import pytest
+
+from benchmarks.bench_finder import make_input
+from tracking_info import finder, finder_by_suffixes, get_scanner
+
+
+@pytest.mark.parametrize('length', [13, 18, 22, 34, 35, 50, 200, 1000])
+@pytest.mark.parametrize('seed', range(5))
+def test_finder_matches_suffix_loop(length, seed):
+    text = make_input(length, seed)
+    assert finder(text) == finder_by_suffixes(text)
+
+
+def test_long_input_uses_combined_pattern():
+    text = make_input(200)
+    assert get_scanner()._get_window_start(text) > 0
+    assert finder(text) is not None
+
+
+@pytest.mark.parametrize('text', ['1Z999AA10123456784', '1Z 999 AA1 0123456784', 'label 1Z999AA10123456784', ''])
+def test_finder_on_scanned_labels(text):
+    assert finder(text) == finder_by_suffixes(text)
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+import tracking_service
+from order_store import OrderStore
+from request_wrapper import SessionExpiredError
+from tracking_service import TrackingService
+
+SEARCH_LINK = 'https://kz.globbing.com/ru/sale-order/view/4471093'
+
+
+class ExpiringWrapper:
+    """RequestWrapper, у которого сессия истекает на странице заказа"""
+
+    def __init__(self, search_html):
+        self._search_html = search_html
+
+    def get(self, url, **kwargs):
+        if url.startswith(SEARCH_LINK):
+            raise SessionExpiredError("Session expired and re-login failed")
+        return FakeResponse(self._search_html)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def service():
+    search_html = (
+        '<table><tbody><tr><td class="track-number__col--out">'
+        f'<a href="{SEARCH_LINK}" title="1ZAR44790309173289">1ZAR44790309173289</a>'
+        '</td></tr></tbody></table>'
+    )
+    return TrackingService(ExpiringWrapper(search_html))
+
+
+def test_fetch_package_info_raises_session_expired(service):
+    tracking_info = service.find_listing('1ZAR44790309173289')
+    assert tracking_info['product_page_link'] == SEARCH_LINK
+    with pytest.raises(SessionExpiredError):
+        service.fetch_package_info(tracking_info)
+
+
+def test_search_tracking_raises_session_expired(service):
+    with pytest.raises(SessionExpiredError):
+        service.search_tracking('1ZAR44790309173289')
+
+
+def test_search_many_reports_session_expired(service):
+    results = list(service.search_many(['1ZAR44790309173289']))
+    assert len(results) == 1
+    assert isinstance(results[0][2], SessionExpiredError)
+
+
+@pytest.mark.parametrize('max_workers', [0, -1])
+def test_search_many_rejects_non_positive_workers(service, max_workers):
+    with pytest.raises(ValueError):
+        list(service.search_many(['1ZAR44790309173289'], max_workers=max_workers))
+
+
+class OfflineWrapper:
+    def get(self, url, **kwargs):
+        raise AssertionError(f"unexpected request to {url}")
+
+
+def test_weighed_local_record_does_not_expire(tmp_path, monkeypatch):
+    store = OrderStore(str(tmp_path / 'orders.db'))
+    try:
+        store.save_orders([{
+            'order_number': '4471093', 'tracking_number': '1ZAR44790309173289',
+            'weight': '1,5 кг', 'price_usd': '11.00 $', 'product_page_link': SEARCH_LINK
+        }])
+        # Через неделю запись не перезаписывалась, но по-прежнему берётся из базы
+        now = time.time() + 7 * 24 * 60 * 60
+        monkeypatch.setattr(tracking_service.time, 'time', lambda: now)
+        service = TrackingService(OfflineWrapper(), order_store=store)
+        tracking_info = service.search_tracking('1ZAR44790309173289')
+    finally:
+        store.close()
+    assert tracking_info['source'] == 'local'
+    assert tracking_info['weight'] == '1,5 кг'
@@ -0,0 +1,172 @@
+"""
+Замеры этапов обработки скана в формате JSON Lines.
+
+Трассировка включается переменной окружения TRACKING_TRACE_FILE или вызовом
+enable_tracing. Пока она выключена, span возвращает один и тот же пустой
+контекст без замеров и выделения памяти.
+
+Сводка по этапам за последний час:
+    python -m tracing trace.jsonl --since 3600
+"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+
+TRACE_FILE_ENV = 'TRACKING_TRACE_FILE'
+
+_lock = threading.Lock()
+_trace_file = None
+
+
+class _NoopSpan:
+    """Пустой span при выключенной трассировке"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """Замер одного этапа; атрибуты можно дополнить через set внутри блока with"""
+
+    __slots__ = ('name', 'attributes', '_started')
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        record = {
+            'ts': time.time(),
+            'span': self.name,
+            'duration_ms': round(duration * 1000, 3),
+            'thread': threading.current_thread().name
+        }
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        record.update(self.attributes)
+        _write(record)
+        return False
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+def _write(record):
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _lock:
+        if _trace_file is not None:
+            _trace_file.write(line + '\n')
+
+
+def enable_tracing(path):
+    """Включает запись замеров в файл path (дописывает в конец)"""
+    global _trace_file
+    with _lock:
+        if _trace_file is not None:
+            _trace_file.close()
+        _trace_file = open(path, 'a', encoding='utf-8', buffering=1)
+
+
+def disable_tracing():
+    global _trace_file
+    with _lock:
+        if _trace_file is not None:
+            _trace_file.close()
+        _trace_file = None
+
+
+def is_enabled():
+    return _trace_file is not None
+
+
+def span(name, **attributes):
+    """
+    Замеряет время блока with
+
+    Args:
+        name: Название этапа, например search.request
+        attributes: Дополнительные поля записи
+    """
+    if _trace_file is None:
+        return _NOOP_SPAN
+    return Span(name, attributes)
+
+
+def percentile(sorted_values, percent):
+    """Процентиль по ближайшему рангу для отсортированного списка"""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(path, since=None, now=None):
+    """
+    Сводка длительностей по этапам
+
+    Args:
+        path: Файл с замерами
+        since: Учитывать только замеры за последние since секунд
+
+    Returns:
+        dict: {этап: {count, p50, p95, p99, max}} в миллисекундах
+    """
+    now = time.time() if now is None else now
+    durations = defaultdict(list)
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Строка, оборванная при аварийном завершении
+            if since is not None and record['ts'] < now - since:
+                continue
+            durations[record['span']].append(record['duration_ms'])
+
+    summary = {}
+    for name, values in durations.items():
+        values.sort()
+        summary[name] = {
+            'count': len(values),
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+            'p99': percentile(values, 99),
+            'max': values[-1]
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сводка замеров этапов по файлу трассировки")
+    parser.add_argument('path', help="Файл JSON Lines с замерами")
+    parser.add_argument('--since', type=float, help="Только замеры за последние N секунд")
+    args = parser.parse_args()
+
+    summary = summarize(args.path, args.since)
+    print(f"{'span':<28} {'count':>7} {'p50, ms':>9} {'p95, ms':>9} {'p99, ms':>9} {'max, ms':>9}")
+    for name, stats in sorted(summary.items()):
+        print(f"{name:<28} {stats['count']:>7} {stats['p50']:>9.1f} {stats['p95']:>9.1f} "
+              f"{stats['p99']:>9.1f} {stats['max']:>9.1f}")
+
+
+if os.environ.get(TRACE_FILE_ENV):
+    enable_tracing(os.environ[TRACE_FILE_ENV])
+
+if __name__ == "__main__":
+    main()
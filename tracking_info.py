@@ -1,21 +1,164 @@
-from tracking_numbers import get_tracking_number  # Добавлен импорт TrackingNumber
+import re
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+from tracking_numbers import DEFINITIONS, get_tracking_number  # Добавлен импорт TrackingNumber
+
+MIN_CANDIDATE_LENGTH = 5
+
+_GROUP_NAME_RE = re.compile(r'\(\?P([<=])(\w+)')
+
+
+class TrackingScanner:
+    """
+    Однопроходный поиск кандидатов трек-номеров сразу для всех курьеров.
+
+    Регулярные выражения всех определений из tracking_numbers собираются
+    в одно выражение, поэтому строка просматривается один раз, а проверка
+    контрольных сумм выполняется только в найденных позициях и только для
+    определений, начиная с совпавшего. Просмотр начинается с той позиции,
+    с которой номер ещё помещается до конца строки.
+
+    Строки, которые целиком помещаются в это окно (обычный скан этикетки),
+    проверяются прежним перебором суффиксов: общее выражение не использует
+    быструю проверку начала шаблона, как fullmatch отдельного определения,
+    и на коротких строках оказывается медленнее.
+    """
+
+    def __init__(self, definitions=None):
+        self._definitions = list(DEFINITIONS if definitions is None else definitions)
+        self._pattern = self._compile()
+        self._max_width = self._get_max_width()
+
+    def _compile(self):
+        """Собирает общее выражение для всех определений"""
+        alternatives = []
+        for index, definition in enumerate(self._definitions):
+            # Имена групп у разных курьеров совпадают, поэтому добавляем префикс
+            pattern = _GROUP_NAME_RE.sub(
+                lambda m, i=index: f"(?P{m.group(1)}_{i}_{m.group(2)}",
+                definition.number_regex.pattern
+            )
+            # Группа d{index} вокруг всей альтернативы закрывается последней,
+            # поэтому match.lastgroup называет определение, с которым совпал суффикс
+            alternatives.append(f"(?P<d{index}>{pattern})")
+
+        # Совпадение нулевой ширины в каждой позиции, с которой суффикс является номером
+        return re.compile("(?=(?:" + "|".join(alternatives) + ")\\Z)")
+
+    def _get_max_width(self):
+        """
+        Максимальное число непробельных символов в номере любого курьера
+
+        Returns:
+            int: Ширина окна или None, если ширина шаблонов не ограничена
+        """
+        max_width = 0
+        for definition in self._definitions:
+            # Пробелы допускаются между любыми символами номера и в ширину не входят
+            pattern = definition.number_regex.pattern.replace('\\s*', '')
+            try:
+                width = sre_parse.parse(pattern).getwidth()[1]
+            except Exception:
+                return None
+            if width >= sre_parse.MAXREPEAT:
+                return None
+            max_width = max(max_width, width)
+        return max_width
+
+    def _get_window_start(self, text):
+        """Первая позиция, с которой суффикс ещё может совпасть с номером"""
+        if self._max_width is None:
+            return 0
+        start = len(text)
+        counted = 0
+        while start > 0 and counted < self._max_width:
+            start -= 1
+            if not text[start].isspace():
+                counted += 1
+        # Ведущие пробелы допускаются шаблонами перед номером
+        while start > 0 and text[start - 1].isspace():
+            start -= 1
+        return start
+
+    def find_all(self, text):
+        """
+        Находит все трек-номера, которыми заканчиваются суффиксы строки
+
+        Args:
+            text: Исходная строка
+
+        Returns:
+            list: Список TrackingNumber в порядке позиций начала
+        """
+        window_start = self._get_window_start(text)
+        if window_start == 0:
+            return self._find_by_suffixes(text)
+
+        found = []
+        last_start = len(text) - MIN_CANDIDATE_LENGTH
+        for match in self._pattern.finditer(text, window_start):
+            start = match.start()
+            if start > last_start:
+                break
+            candidate = text[start:]
+            # Предыдущие альтернативы с этим суффиксом не совпали, проверяем начиная с совпавшей
+            first = int(match.lastgroup[1:])
+            for definition in self._definitions[first:]:
+                tr = definition.test(candidate)
+                if tr is not None and tr.valid:
+                    found.append(tr)
+                    break
+        return found
+
+    def _find_by_suffixes(self, text):
+        """Проверка каждого суффикса всеми определениями, как в get_tracking_number"""
+        found = []
+        for start in range(len(text) - MIN_CANDIDATE_LENGTH + 1):
+            candidate = text[start:]
+            for definition in self._definitions:
+                tr = definition.test(candidate)
+                if tr is not None and tr.valid:
+                    found.append(tr)
+                    break
+        return found
+
+
+_scanner = None
+
+
+def get_scanner():
+    """Возвращает общий экземпляр TrackingScanner, создавая его при первом вызове"""
+    global _scanner
+    if _scanner is None:
+        _scanner = TrackingScanner()
+    return _scanner
+
+
+def _select_number(final):
+    """Выбирает самый короткий номер курьера, которому принадлежит самый длинный номер"""
+    if not final:
+        return None
+
+    # Находим код курьера самого длинного элемента
+    longest_courier_code = max(final, key=lambda x: len(x.number)).courier.code
+
+    # Фильтруем элементы по коду курьера и находим самый короткий
+    same_courier_final = [tr.number for tr in final if tr.courier.code == longest_courier_code]
+    return min(same_courier_final, key=len) if same_courier_final else None
+
 
 def finder(row_track):
-  save = row_track
-  final = []
-  while len(row_track) > 4:
-      tr = get_tracking_number(row_track)
-      if tr is not None:
-        final.append(tr)
-      row_track = row_track[1:]
-  
-  if not final:
-      return None
-  
-  # Находим код курьера самого длинного элемента
-  longest_courier_code = max(final, key=lambda x: len(x.number)).courier.code
-  
-  # Фильтруем элементы по коду курьера и находим самый короткий
-  same_courier_final = [tr.number for tr in final if tr.courier.code == longest_courier_code]
-  return min(same_courier_final, key=len) if same_courier_final else None
+    return _select_number(get_scanner().find_all(row_track))
+
 
+def finder_by_suffixes(row_track):
+    """Прежний вариант finder: отдельная проверка каждого суффикса строки"""
+    final = []
+    while len(row_track) >= MIN_CANDIDATE_LENGTH:
+        tr = get_tracking_number(row_track)
+        if tr is not None:
+            final.append(tr)
+        row_track = row_track[1:]
+    return _select_number(final)
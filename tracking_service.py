@@ -1,11 +1,40 @@
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
 import time
 import logging
 import traceback
+from html_parsers import get_parser
+from order_store import extract_order_number_from_link, format_weight, format_price
+from request_coalescer import RequestCoalescer
+from request_wrapper import SessionExpiredError
+from tracing import span
+
+BATCH_MAX_WORKERS = 4
 
 class TrackingService:
-    def __init__(self, request_wrapper):
+    def __init__(self, request_wrapper, max_workers=BATCH_MAX_WORKERS, order_store=None, max_age=None,
+                 parser=None, response_cache=None, coalescer=None):
+        """
+        Args:
+            request_wrapper: RequestWrapper авторизованной сессии
+            max_workers: Число одновременных запросов в search_many
+            order_store: OrderStore для ответа из локальной базы или None
+            max_age: Срок в секундах, после которого запись базы считается
+                устаревшей; по умолчанию записи не устаревают: вес и стоимость
+                полученного заказа не меняются, а hui не обновляет updated_at
+                заказов, которые не изменились
+            parser: Бэкенд разбора HTML из html_parsers; по умолчанию
+                самый быстрый из установленных
+            response_cache: ResponseCache для страниц заказов или None
+            coalescer: RequestCoalescer для объединения одинаковых запросов
+        """
         self.request_wrapper = request_wrapper
+        self.max_workers = max_workers
+        self.order_store = order_store
+        self.max_age = max_age
+        self.parser = parser or get_parser()
+        self.response_cache = response_cache
+        self.coalescer = coalescer or RequestCoalescer()
 
     def search_tracking(self, tracking_number):
         """
@@ -16,57 +45,203 @@ class TrackingService:
             
         Returns:
             dict: Результат поиска с информацией о посылке или None в случае ошибки
+
+        Raises:
+            SessionExpiredError: Если сессия истекла и повторный вход не удался
         """
         try:
-            timestamp = int(time.time() * 1000)
-            url = f"https://kz.globbing.com/ru/profile/my-orders/received?limit=50&search={tracking_number}&t={timestamp}"
-
-            headers = {
-                'Accept': '*/*',
-                'Referer': 'https://kz.globbing.com/ru/profile/my-orders/received',
-                'X-Requested-With': 'XMLHttpRequest'
-            }
-
-            response = self.request_wrapper.get(url, headers=headers)
-            response.raise_for_status()
-            
-            tracking_info = self._parse_search_response(response.text)
-            if tracking_info:
-                package_info = self._get_package_info(tracking_info['product_page_link'])
-                tracking_info.update(package_info)
-                return tracking_info
-            
-            return None
+            return self._search_tracking(tracking_number)
 
+        except SessionExpiredError:
+            raise  # Не выдаём "не найдено", если не удалось войти
         except Exception as e:
             logging.error(f"Error searching tracking number: {e}")
             traceback.print_exc()
             return None
 
+    def search_many(self, tracking_numbers, max_workers=None):
+        """
+        Параллельный поиск нескольких трек-номеров через общую сессию
+
+        Результаты возвращаются по мере готовности, а не в порядке входа.
+        Номера читаются из входа по мере освобождения потоков (в работе не
+        больше двух на поток), поэтому входом может быть файл или stdin.
+
+        Args:
+            tracking_numbers: Итерируемый набор трек-номеров
+            max_workers: Максимальное число одновременных запросов
+                (по умолчанию self.max_workers)
+
+        Yields:
+            tuple: (tracking_number, tracking_info, error)
+                tracking_info - результат поиска или None, если посылка не найдена
+                error - исключение, если запрос завершился ошибкой, иначе None
+        """
+        workers = self.max_workers if max_workers is None else max_workers
+        if workers <= 0:
+            raise ValueError("Число потоков должно быть положительным")
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        pending_numbers = iter(tracking_numbers)
+        futures = {}
+
+        def submit_next(count):
+            for tracking_number in islice(pending_numbers, count):
+                futures[executor.submit(self._search_tracking, tracking_number)] = tracking_number
+
+        try:
+            submit_next(workers * 2)
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tracking_number = futures.pop(future)
+                    try:
+                        yield tracking_number, future.result(), None
+                    except Exception as e:
+                        logging.error(f"Error searching tracking number {tracking_number}: {e}")
+                        yield tracking_number, None, e
+                submit_next(len(done))
+        finally:
+            # Если вызывающий прервал перебор, не выполняем оставшиеся запросы
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _search_tracking(self, tracking_number):
+        """Поиск трек-номера без перехвата ошибок: сначала в базе, затем на сайте"""
+        return self.fetch_package_info(self.find_listing(tracking_number))
+
+    def find_listing(self, tracking_number):
+        """
+        Первый этап поиска: запись локальной базы или строка поиска на сайте
+
+        Args:
+            tracking_number: Строка поиска (трек-номер)
+
+        Returns:
+            dict: Результат поиска; для записей с сайта без веса и стоимости,
+                их загружает fetch_package_info. None, если посылка не найдена
+        """
+        local_order = self._find_local_order(tracking_number)
+        if local_order and not self._is_stale(local_order):
+            logging.info(f"Tracking number found in local store: {tracking_number}")
+            return self._order_to_tracking_info(local_order)
+
+        try:
+            # Одинаковые поиски, отправленные почти одновременно, выполняются один раз
+            tracking_info = self.coalescer.run(('search', tracking_number), self._search_remote, tracking_number)
+        except Exception as e:
+            if not local_order:
+                raise
+            # Устаревшая запись лучше, чем ошибка
+            logging.warning(f"Search failed, using stale local record for {tracking_number}: {e}")
+            return self._order_to_tracking_info(local_order)
+
+        if tracking_info:
+            # Копия: результат общий для всех объединённых вызовов
+            tracking_info = dict(tracking_info, source='network')
+        return tracking_info
+
+    def fetch_package_info(self, tracking_info):
+        """
+        Второй этап поиска: вес и стоимость со страницы заказа
+
+        Записи из локальной базы возвращаются без изменений, результаты
+        с сайта дополняются и сохраняются в базу.
+        """
+        if not tracking_info or tracking_info.get('source') == 'local':
+            return tracking_info
+
+        product_page_link = tracking_info['product_page_link']
+        package_info = self.coalescer.run(('package', product_page_link), self._get_package_info, product_page_link)
+        tracking_info.update(package_info)
+        self._save_local(tracking_info)
+        return tracking_info
+
+    def _find_local_order(self, tracking_number):
+        """Взвешенный заказ из локальной базы по точному или нормализованному номеру"""
+        if self.order_store is None:
+            return None
+        try:
+            order = self.order_store.find_by_tracking_number(tracking_number)
+        except Exception as e:
+            logging.error(f"Error reading local store: {e}")
+            return None
+        if order is None or order['weight'] is None:
+            return None
+        return order
+
+    def _is_stale(self, order):
+        if self.max_age is None:
+            return False
+        return time.time() - (order['updated_at'] or 0) > self.max_age
+
+    def _order_to_tracking_info(self, order):
+        """Преобразует запись базы в формат результата поиска"""
+        return {
+            'tracking_number': order['tracking_number'],
+            'product_page_link': order['product_page_link'],
+            'raw_tracking_number': order['tracking_number'],
+            'weight': format_weight(order['weight']),
+            'price_usd': format_price(order['price_usd']),
+            'source': 'local'
+        }
+
+    def _save_local(self, tracking_info):
+        """Сохраняет результат поиска на сайте в локальную базу"""
+        if self.order_store is None or not tracking_info.get('weight'):
+            return
+        order_number = extract_order_number_from_link(tracking_info['product_page_link'])
+        if not order_number:
+            return
+        try:
+            self.order_store.save_orders([dict(tracking_info, order_number=order_number)])
+        except Exception as e:
+            logging.error(f"Error writing local store: {e}")
+
+    def _search_remote(self, tracking_number):
+        """Поиск трек-номера на сайте"""
+        timestamp = int(time.time() * 1000)
+        url = f"https://kz.globbing.com/ru/profile/my-orders/received?limit=50&search={tracking_number}&t={timestamp}"
+
+        headers = {
+            'Accept': '*/*',
+            'Referer': 'https://kz.globbing.com/ru/profile/my-orders/received',
+            'X-Requested-With': 'XMLHttpRequest'
+        }
+
+        with span('search.request'):
+            response = self.request_wrapper.get(url, headers=headers)
+            response.raise_for_status()
+        
+        with span('search.parse'):
+            return self._parse_search_response(response.text)
+
     def _parse_search_response(self, html_content):
         """Извлекает информацию о трекинге из HTML"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        tracking_element = soup.select_one('.track-number__col--out a')
+        tracking_info = self.parser.parse_search_response(html_content)
         
-        if not tracking_element:
+        if not tracking_info:
             logging.info("Tracking number element not found")
             return None
             
-        return {
-            'tracking_number': tracking_element.get('title'),
-            'product_page_link': tracking_element.get('href'),
-            'raw_tracking_number': tracking_element.text.strip()
-        }
+        return tracking_info
 
     def _get_package_info(self, product_page_link):
         """Получает информацию о весе и стоимости посылки"""
         try:
-            html_content = self._fetch_page_content(product_page_link)
+            with span('fetch_page_content'):
+                html_content = self._fetch_page_content(product_page_link)
             if not html_content:
                 return {'weight': None, 'price_usd': None}
                 
-            return self._extract_weight_and_price(html_content)
+            with span('extract_weight_and_price'):
+                package_info = self._extract_weight_and_price(html_content)
+            if self.response_cache is not None and not package_info.get('weight'):
+                # Посылку ещё не взвесили: страница изменится, не держим её в кэше
+                self.response_cache.invalidate(product_page_link)
+            return package_info
 
+        except SessionExpiredError:
+            raise  # Иначе посылка без веса выглядит как ещё не взвешенная
         except Exception as e:
             logging.error(f"Error getting package info: {e}")
             traceback.print_exc()
@@ -79,26 +254,16 @@ class TrackingService:
             'Referer': 'https://kz.globbing.com/ru/profile/my-orders/received'
         }
 
+        if self.response_cache is not None:
+            return self.response_cache.fetch(self.request_wrapper, product_page_link, headers=headers)
+
         response = self.request_wrapper.get(product_page_link, headers=headers)
         response.raise_for_status()
         return response.text
 
     def _extract_weight_and_price(self, html_content):
         """Извлекает вес и стоимость из HTML"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        result = {'weight': None, 'price_usd': None}
-        
-        # Извлекаем вес
-        weight_title = soup.find("p", class_="fs12", string="Вес")
-        if weight_title:
-            result['weight'] = weight_title.find_next("p", class_="fs14").text.strip()
-        
-        # Извлекаем стоимость
-        price_element = soup.find("p", class_="fs12", string="Стоимость доставки")
-        if price_element:
-            result['price_usd'] = price_element.find_next("p", class_="fs14").text.strip()
-            
-        return result
+        return self.parser.extract_weight_and_price(html_content)
 
     def process_tracking_number(self, tracking_number, finder_func):
         """
@@ -114,7 +279,15 @@ class TrackingService:
                 tracking_number_text - обработанный трек-номер или None
         """
         search_result = self.search_tracking(tracking_number)
-        
+        return self.resolve_tracking_number(tracking_number, search_result, finder_func)
+
+    def resolve_tracking_number(self, tracking_number, search_result, finder_func):
+        """
+        Выбирает трек-номер для результата поиска
+
+        Returns:
+            tuple: (tracking_info, tracking_number_text), как в process_tracking_number
+        """
         if search_result and search_result.get('weight'):
             tracking_number_text = finder_func(search_result['tracking_number'])
             if isinstance(tracking_number_text, (tuple, list)):
@@ -1,74 +1,168 @@
+import re
+
+# Символы русской раскладки и клавиши, на которых они стоят в английской
+RUS_TO_ENG = {
+    'а': 'f',
+    'б': ',',
+    'в': 'd',
+    'г': 'u',
+    'д': 'l',
+    'е': 't',
+    'ё': '`',
+    'ж': ';',
+    'з': 'p',
+    'и': 'b',
+    'й': 'q',
+    'к': 'r',
+    'л': 'k',
+    'м': 'v',
+    'н': 'y',
+    'о': 'j',
+    'п': 'g',
+    'р': 'h',
+    'с': 'c',
+    'т': 'n',
+    'у': 'e',
+    'ф': 'a',
+    'х': '[',
+    'ц': 'w',
+    'ч': 'x',
+    'ш': 'i',
+    'щ': 'o',
+    'ъ': ']',
+    'ы': 's',
+    'ь': 'm',
+    'э': "'",
+    'ю': '.',
+    'я': 'z',
+    'А': 'F',
+    'Б': '<',
+    'В': 'D',
+    'Г': 'U',
+    'Д': 'L',
+    'Е': 'T',
+    'Ё': '~',
+    'Ж': ':',
+    'З': 'P',
+    'И': 'B',
+    'Й': 'Q',
+    'К': 'R',
+    'Л': 'K',
+    'М': 'V',
+    'Н': 'Y',
+    'О': 'J',
+    'П': 'G',
+    'Р': 'H',
+    'С': 'C',
+    'Т': 'N',
+    'У': 'E',
+    'Ф': 'A',
+    'Х': '{',
+    'Ц': 'W',
+    'Ч': 'X',
+    'Ш': 'I',
+    'Щ': 'O',
+    'Ъ': '}',
+    'Ы': 'S',
+    'Ь': 'M',
+    'Э': '"',
+    'Ю': '>',
+    'Я': 'Z',
+    '№': '#',
+}
+
+_TRANSLATION_TABLE = str.maketrans(RUS_TO_ENG)
+_LAYOUT_CHARS_RE = re.compile(f"[{''.join(RUS_TO_ENG)}]")
+_RUSSIAN_VOWELS = frozenset('аеёиоуыэюяАЕЁИОУЫЭЮЯ')
+MIN_RUSSIAN_WORD_LETTERS = 4
+MIN_RUSSIAN_VOWEL_SHARE = 0.3
+
+
+def _build_byte_table():
+    """Таблица bytes.translate для текста в cp1251, где вся раскладка занимает по байту"""
+    table = bytearray(range(256))
+    for rus, eng in RUS_TO_ENG.items():
+        table[rus.encode('cp1251')[0]] = ord(eng)
+    return bytes(table)
+
+
+_BYTE_TABLE = _build_byte_table()
+
+
 def translate_rus_to_eng(text):
-    rus_to_eng = {
-        'а': 'f',
-        'б': ',',
-        'в': 'd',
-        'г': 'u',
-        'д': 'l',
-        'е': 't',
-        'ё': '`',
-        'ж': ';',
-        'з': 'p',
-        'и': 'b',
-        'й': 'q',
-        'к': 'r',
-        'л': 'k',
-        'м': 'v',
-        'н': 'y',
-        'о': 'j',
-        'п': 'g',
-        'р': 'h',
-        'с': 'c',
-        'т': 'n',
-        'у': 'e',
-        'ф': 'a',
-        'х': '[',
-        'ц': 'w',
-        'ч': 'x',
-        'ш': 'i',
-        'щ': 'o',
-        'ъ': ']',
-        'ы': 's',
-        'ь': 'm',
-        'э': "'",
-        'ю': '.',
-        'я': 'z',
-        'А': 'F',
-        'Б': '<',
-        'В': 'D',
-        'Г': 'U',
-        'Д': 'L',
-        'Е': 'T',
-        'Ё': '~',
-        'Ж': ':',
-        'З': 'P',
-        'И': 'B',
-        'Й': 'Q',
-        'К': 'R',
-        'Л': 'K',
-        'М': 'V',
-        'Н': 'Y',
-        'О': 'J',
-        'П': 'G',
-        'Р': 'H',
-        'С': 'C',
-        'Т': 'N',
-        'У': 'E',
-        'Ф': 'A',
-        'Х': '{',
-        'Ц': 'W',
-        'Ч': 'X',
-        'Ш': 'I',
-        'Щ': 'O',
-        'Ъ': '}',
-        'Ы': 'S',
-        'Ь': 'M',
-        'Э': '"',
-        'Ю': '>',
-        'Я': 'Z',
-        '№': '#',
-    }
-    translated = ''
-    for c in text:
-        translated += rus_to_eng.get(c, c)
-    return translated
+    """Переводит символы, набранные в русской раскладке, в английскую"""
+    # Обычно переводить нечего: поиск по регулярному выражению быстрее перевода
+    if not _LAYOUT_CHARS_RE.search(text):
+        return text
+    try:
+        # Перевод байтов в 8-битной кодировке на порядок быстрее str.translate
+        return text.encode('cp1251').translate(_BYTE_TABLE).decode('cp1251')
+    except UnicodeEncodeError:
+        return text.translate(_TRANSLATION_TABLE)
+
+
+def looks_like_russian(text):
+    """
+    Проверяет, что текст набран по-русски намеренно, а не в неверной раскладке
+
+    Трек-номера содержат цифры, а латинские буквы в русской раскладке дают
+    в основном согласные. Русский текст без цифр с обычной долей гласных
+    считается настоящим.
+    """
+    if any(c.isdigit() for c in text):
+        return False
+    letters = [c for c in text if c.isalpha()]
+    if len(letters) < MIN_RUSSIAN_WORD_LETTERS:
+        return False
+    vowels = sum(1 for c in letters if c in _RUSSIAN_VOWELS)
+    return vowels / len(letters) >= MIN_RUSSIAN_VOWEL_SHARE
+
+
+def _common_prefix_length(a, b):
+    """Длина общего начала строк: двоичный поиск со сравнением срезов"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def changed_span(old_text, new_text):
+    """
+    Участок new_text, которого не было в old_text
+
+    Returns:
+        tuple: (start, end) - границы нового участка в new_text
+    """
+    if new_text.startswith(old_text):
+        return len(old_text), len(new_text)  # Дописали в конец, самый частый случай
+    start = _common_prefix_length(old_text, new_text)
+    # Общий конец ищем только после общего начала
+    suffix = _common_prefix_length(old_text[start:][::-1], new_text[start:][::-1])
+    return start, len(new_text) - suffix
+
+
+def translate_changed_span(old_text, new_text, auto_detect=False):
+    """
+    Переводит только набранный или вставленный участок текста
+
+    Перевод не меняет длину текста, поэтому позиция курсора остаётся верной.
+
+    Args:
+        old_text: Текст до изменения (уже переведённый)
+        new_text: Текст после изменения
+        auto_detect: Не переводить вставленный участок, похожий на настоящий русский текст
+
+    Returns:
+        tuple: (start, end, translated) для замены участка или None, если переводить нечего
+    """
+    start, end = changed_span(old_text, new_text)
+    span = new_text[start:end]
+    if not span or not _LAYOUT_CHARS_RE.search(span):
+        return None
+    if auto_detect and looks_like_russian(span):
+        return None
+    return start, end, translate_rus_to_eng(span)
@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import messagebox
 
+MAX_RESULT_ROWS = 10
+
 class UIManager:
     def __init__(self, root):
         self.root = root
@@ -37,49 +39,99 @@ class UIManager:
         self.widgets['entry'] = entry
         return entry
 
-    def setup_tracking_display(self):
-        """Создание элементов для отображения информации о трекинге"""
-        # Метка для отображения введенного трек-номера
-        tracking_label = tk.Label(self.root, text="")
-        tracking_label.pack(pady=5)
+    def setup_results_list(self):
+        """Создание списка результатов: по строке на каждый обработанный скан"""
+        results_frame = tk.Frame(self.root)
+        results_frame.pack(pady=10, fill=tk.X)
+
+        self.widgets['results_frame'] = results_frame
+        self._result_rows = []
+
+    def add_result_row(self, tracking_text, raw_tracking_text, summary, message, copy_callback):
+        """
+        Добавление строки результата сверху списка
+
+        Args:
+            tracking_text: Обработанный трек-номер
+            raw_tracking_text: Трек-номер с сайта
+            summary: Вес, стоимость или текст ошибки
+            message: Сообщение для клиента или None
+            copy_callback: Функция копирования текста в буфер обмена
+        """
+        row = tk.Frame(self.widgets['results_frame'], bd=1, relief=tk.GROOVE)
+        if self._result_rows:
+            row.pack(fill=tk.X, pady=2, before=self._result_rows[0])
+        else:
+            row.pack(fill=tk.X, pady=2)
+
+        tracking_label = tk.Label(row, text=tracking_text or "—", width=30, anchor="w")
+        tracking_label.grid(row=0, column=0, sticky="w", padx=5)
+        tk.Label(row, text=raw_tracking_text or "", anchor="w").grid(row=1, column=0, sticky="w", padx=5)
+        tk.Label(row, text=summary, justify=tk.LEFT, anchor="w").grid(
+            row=0, column=1, rowspan=2, sticky="w", padx=5
+        )
 
-        # Метка для отображения веса и стоимости
-        weight_cost_label = tk.Label(self.root, text="")
-        weight_cost_label.pack(pady=10)
+        copy_track_button = tk.Button(row, text="Copy Tracking Number")
+        copy_track_button.config(command=lambda: self._copy_from_row(
+            copy_callback, tracking_text, copy_track_button, "Copy Tracking Number"
+        ))
+        copy_track_button.grid(row=0, column=2, padx=5, pady=2, sticky="ew")
+        if not tracking_text:
+            copy_track_button.config(state=tk.DISABLED)
 
-        # Поле для нормального трек-номера
-        tracking_field = tk.Text(self.root, height=1, width=60)
-        tracking_field.pack(pady=10)
-        tracking_field.config(state=tk.NORMAL)
+        copy_message_button = tk.Button(row, text="Copy Message")
+        copy_message_button.config(command=lambda: self._copy_from_row(
+            copy_callback, message, copy_message_button, "Copy Message"
+        ))
+        copy_message_button.grid(row=1, column=2, padx=5, pady=2, sticky="ew")
+        if not message:
+            copy_message_button.config(state=tk.DISABLED)
 
-        # Поле для исходного трек-номера
-        raw_tracking_field = tk.Text(self.root, height=1, width=60)
-        raw_tracking_field.pack(pady=10)
-        raw_tracking_field.config(state=tk.NORMAL)
+        # Подсветка зеленым на 0.5 секунд
+        default_bg = tracking_label.cget("bg")
+        tracking_label.config(bg="green")
+        self.root.after(500, lambda: tracking_label.winfo_exists() and tracking_label.config(bg=default_bg))
+
+        self._result_rows.insert(0, row)
+        while len(self._result_rows) > MAX_RESULT_ROWS:
+            self._result_rows.pop().destroy()
+
+    def _copy_from_row(self, copy_callback, text, button, button_text):
+        """Копирование текста из строки результата"""
+        copy_callback(text)
+        button.config(text="Copied")
+        self.root.after(1000, lambda: button.winfo_exists() and button.config(text=button_text))
+
+    def setup_status_bar(self):
+        """Создание строки состояния внизу окна"""
+        status_bar = tk.Label(self.root, text="", bd=1, relief=tk.SUNKEN, anchor="w")
+        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.widgets['status_bar'] = status_bar
+
+    def update_status_bar(self, text):
+        """Обновление строки состояния"""
+        self.widgets['status_bar'].config(text=text)
+
+    def setup_pending_list(self):
+        """Создание списка трек-номеров, поиск которых ещё выполняется"""
+        pending_label = tk.Label(self.root, text="В обработке: 0")
+        pending_label.pack(pady=(10, 0))
+
+        pending_list = tk.Listbox(self.root, height=4, width=60)
+        pending_list.pack(pady=5)
 
         self.widgets.update({
-            'tracking_label': tracking_label,
-            'weight_cost_label': weight_cost_label,
-            'tracking_field': tracking_field,
-            'raw_tracking_field': raw_tracking_field
+            'pending_label': pending_label,
+            'pending_list': pending_list
         })
 
-    def setup_copy_buttons(self, copy_track_callback, copy_message_callback):
-        """Создание кнопок копирования"""
-        copy_track_button = tk.Button(
-            self.root, text="Copy Tracking Number", command=copy_track_callback
-        )
-        copy_track_button.pack(pady=10)
-
-        copy_message_button = tk.Button(
-            self.root, text="Copy Message", command=copy_message_callback
-        )
-        copy_message_button.pack(pady=10)
-
-        self.widgets.update({
-            'copy_track_button': copy_track_button,
-            'copy_message_button': copy_message_button
-        })
+    def update_pending_list(self, tracking_numbers):
+        """Обновление списка трек-номеров в обработке"""
+        pending_list = self.widgets['pending_list']
+        pending_list.delete(0, tk.END)
+        for tracking_number in tracking_numbers:
+            pending_list.insert(tk.END, tracking_number)
+        self.widgets['pending_label'].config(text=f"В обработке: {len(tracking_numbers)}")
 
     def setup_cost_modifier(self, initial_value, save_callback):
         """Создание элементов для модификатора стоимости"""
@@ -104,34 +156,6 @@ class UIManager:
         entry.delete(0, tk.END)
         entry.focus()
 
-    def update_tracking_label(self, text):
-        """Обновление метки с трек-номером"""
-        self.widgets['tracking_label'].config(text=text)
-
-    def update_weight_cost_label(self, text):
-        """Обновление метки с весом и стоимостью"""
-        self.widgets['weight_cost_label'].config(text=text)
-
-    def update_tracking_fields(self, tracking_text, raw_tracking_text):
-        """Обновление полей с трек-номерами"""
-        # Обновляем обычный трек-номер
-        field = self.widgets['tracking_field']
-        field.config(state=tk.NORMAL)
-        field.delete(1.0, tk.END)
-        field.insert(tk.END, tracking_text)
-        
-        # Обновляем исходный трек-номер
-        raw_field = self.widgets['raw_tracking_field']
-        raw_field.config(state=tk.NORMAL)
-        raw_field.delete(1.0, tk.END)
-        raw_field.insert(tk.END, raw_tracking_text)
-
-        # Подсветка зеленым на 0.5 секунд
-        field.config(bg="green")
-        raw_field.config(bg="green")
-        self.root.after(500, lambda: field.config(bg="white"))
-        self.root.after(500, lambda: raw_field.config(bg="white"))
-
     def get_entry_text(self):
         """Получение текста из поля ввода"""
         return self.widgets['entry'].get()
@@ -140,10 +164,6 @@ class UIManager:
         """Получение значения модификатора стоимости"""
         return self.widgets['cost_entry'].get()
 
-    def get_tracking_field_text(self):
-        """Получение текста из поля трек-номера"""
-        return self.widgets['tracking_field'].get("1.0", tk.END).strip()
-
     def show_error(self, title, message):
         """Отображение сообщения об ошибке"""
         messagebox.showerror(title, message)
@@ -155,10 +175,3 @@ class UIManager:
     def show_info(self, title, message):
         """Отображение информационного сообщения"""
         messagebox.showinfo(title, message)
-
-    def update_copy_button_text(self, button_name, text):
-        """Обновление текста кнопки копирования"""
-        self.widgets[button_name].config(text=text)
-        self.root.after(1000, lambda: self.widgets[button_name].config(
-            text="Copy Tracking Number" if button_name == 'copy_track_button' else "Copy Message"
-        ))